@@ -174,6 +174,104 @@ class Settings:
     
     # ========== GEMINI ==========
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+    
+    # ========== GOOGLE PLACES ==========
+    PLACES_MAX_CONCURRENCY = int(os.getenv("PLACES_MAX_CONCURRENCY", "6"))
+    PLACES_UPSTREAM_THREADS = int(os.getenv("PLACES_UPSTREAM_THREADS", "16"))  # dedicated pool for blocking client calls
+    PLACES_MAX_PAGES = int(os.getenv("PLACES_MAX_PAGES", "3"))
+    PLACES_PAGE_TOKEN_DELAY = float(os.getenv("PLACES_PAGE_TOKEN_DELAY", "2.0"))
+    PLACES_PAGE_TOKEN_RETRIES = int(os.getenv("PLACES_PAGE_TOKEN_RETRIES", "3"))
+    PLACES_PAGINATE_MIN_RADIUS = int(os.getenv("PLACES_PAGINATE_MIN_RADIUS", "2000"))
+    PLACE_POOL_TARGET_CANDIDATES = int(os.getenv("PLACE_POOL_TARGET_CANDIDATES", "40"))
+    PLACES_ADAPTIVE_SEARCH = os.getenv("PLACES_ADAPTIVE_SEARCH", "True").lower() == "true"
+    PLACES_ADAPTIVE_START_RADIUS = int(os.getenv("PLACES_ADAPTIVE_START_RADIUS", "250"))
+    PLACES_ADAPTIVE_GROWTH = float(os.getenv("PLACES_ADAPTIVE_GROWTH", "2.0"))
+    PLACES_ADAPTIVE_TARGET_CANDIDATES = int(os.getenv("PLACES_ADAPTIVE_TARGET_CANDIDATES", "12"))
+    
+    # ========== PLACES QUOTA ==========
+    PLACES_QPS = float(os.getenv("PLACES_QPS", "50"))
+    PLACES_QPS_BY_KEY = os.getenv("PLACES_QPS_BY_KEY", "")  # "key1:20,key2:5"
+    PLACES_QUOTA_BURST_SECONDS = float(os.getenv("PLACES_QUOTA_BURST_SECONDS", "1.0"))
+    PLACES_QUOTA_WAIT = float(os.getenv("PLACES_QUOTA_WAIT", "2.0"))
+    PLACES_QUOTA_BACKOFF_SECONDS = float(os.getenv("PLACES_QUOTA_BACKOFF_SECONDS", "2.0"))
+    PLACES_QUOTA_MIN_RATE_RATIO = float(os.getenv("PLACES_QUOTA_MIN_RATE_RATIO", "0.1"))
+    PLACES_QUOTA_WORKERS = int(os.getenv("PLACES_QUOTA_WORKERS", os.getenv("WEB_CONCURRENCY", "1")))
+    
+    # ========== UPSTREAM RECORD / REPLAY ==========
+    UPSTREAM_MODE = os.getenv("UPSTREAM_MODE", "live")  # live, record or replay
+    UPSTREAM_CORPUS_PATH = os.getenv("UPSTREAM_CORPUS_PATH", "upstream_corpus.jsonl")
+    UPSTREAM_REPLAY_LATENCY_MS = float(os.getenv("UPSTREAM_REPLAY_LATENCY_MS", "-1"))  # -1 = recorded latency
+    UPSTREAM_REPLAY_LATENCY_SCALE = float(os.getenv("UPSTREAM_REPLAY_LATENCY_SCALE", "1.0"))
+    UPSTREAM_REPLAY_JITTER_MS = float(os.getenv("UPSTREAM_REPLAY_JITTER_MS", "0"))
+    UPSTREAM_REPLAY_FALLBACK_SERVICES = os.getenv("UPSTREAM_REPLAY_FALLBACK_SERVICES", "gemini").split(",")
+    
+    # ========== PLACES CACHE ==========
+    PLACES_CACHE_ENABLED = os.getenv("PLACES_CACHE_ENABLED", "True").lower() == "true"
+    PLACES_CACHE_TTL = int(os.getenv("PLACES_CACHE_TTL", "900"))
+    PLACES_CACHE_STALE_TTL = int(os.getenv("PLACES_CACHE_STALE_TTL", "3600"))
+    PLACES_CACHE_NEGATIVE_TTL = int(os.getenv("PLACES_CACHE_NEGATIVE_TTL", "300"))
+    PLACES_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_CACHE_MAX_ENTRIES", "20000"))
+    PLACES_CACHE_TILE_SLACK = float(os.getenv("PLACES_CACHE_TILE_SLACK", "0.5"))  # cell half-diagonal / radius bucket
+    
+    # ========== PLACE STORE ==========
+    PLACE_STORE_BACKEND = os.getenv("PLACE_STORE_BACKEND", "sqlite")  # sqlite, postgres or none
+    PLACE_STORE_SQLITE_PATH = os.getenv("PLACE_STORE_SQLITE_PATH", "places.db")
+    PLACE_STORE_FRESH_TTL = int(os.getenv("PLACE_STORE_FRESH_TTL", "86400"))
+    PLACE_STORE_ACTIVE_WINDOW = int(os.getenv("PLACE_STORE_ACTIVE_WINDOW", "259200"))
+    PLACE_STORE_REFRESH_INTERVAL = int(os.getenv("PLACE_STORE_REFRESH_INTERVAL", "300"))
+    PLACE_STORE_REFRESH_BATCH = int(os.getenv("PLACE_STORE_REFRESH_BATCH", "50"))
+    
+    # ========== HEALTHY PLACE INDEX ==========
+    HEALTHY_INDEX_ENABLED = os.getenv("HEALTHY_INDEX_ENABLED", "True").lower() == "true"
+    HEALTHY_INDEX_PRECISION = int(os.getenv("HEALTHY_INDEX_PRECISION", "6"))  # ~1.2km x 0.6km cells
+    HEALTHY_INDEX_MAX_PLACES = int(os.getenv("HEALTHY_INDEX_MAX_PLACES", "100000"))
+    
+    # ========== RULE ENGINE ==========
+    RULES_FROM_DATABASE = os.getenv("RULES_FROM_DATABASE", "True").lower() == "true"
+    RULES_RELOAD_INTERVAL = int(os.getenv("RULES_RELOAD_INTERVAL", "30"))
+    RULES_MEMO_MAX_ENTRIES = int(os.getenv("RULES_MEMO_MAX_ENTRIES", "50000"))
+    RULES_SNAPSHOT_MMAP = os.getenv("RULES_SNAPSHOT_MMAP", "True").lower() == "true"
+    RULES_SNAPSHOT_DIR = os.getenv("RULES_SNAPSHOT_DIR", "rule_snapshots")
+    
+    # ========== TARGET RANKING ==========
+    TARGET_TOP_K = int(os.getenv("TARGET_TOP_K", "3"))
+    TARGET_WEIGHT_DISTANCE = float(os.getenv("TARGET_WEIGHT_DISTANCE", "1.0"))
+    TARGET_WEIGHT_RATING = float(os.getenv("TARGET_WEIGHT_RATING", "0.3"))
+    TARGET_WEIGHT_POPULARITY = float(os.getenv("TARGET_WEIGHT_POPULARITY", "0.5"))
+    TARGET_WEIGHT_SEVERITY = float(os.getenv("TARGET_WEIGHT_SEVERITY", "1.0"))
+    TARGET_CATEGORY_SEVERITY = os.getenv("TARGET_CATEGORY_SEVERITY", "fast_food:1.0,bar_pub:0.8")
+    
+    # ========== PIPELINE DEADLINES (seconds) ==========
+    PIPELINE_PLACES_TIMEOUT = float(os.getenv("PIPELINE_PLACES_TIMEOUT", "8.0"))
+    PIPELINE_ALTERNATIVES_TIMEOUT = float(os.getenv("PIPELINE_ALTERNATIVES_TIMEOUT", "2.0"))
+    PIPELINE_MESSAGE_TIMEOUT = float(os.getenv("PIPELINE_MESSAGE_TIMEOUT", "6.0"))
+    
+    # ========== BATCH RECOMMENDATIONS ==========
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    
+    # ========== RESPONSE CACHE ==========
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "False").lower() == "true"
+    RESPONSE_CACHE_PRECISION = int(os.getenv("RESPONSE_CACHE_PRECISION", "7"))  # ~150m cells
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+    
+    # ========== HOT ZONES ==========
+    HOT_ZONES_ENABLED = os.getenv("HOT_ZONES_ENABLED", "False").lower() == "true"
+    HOT_ZONES_TOP_N = int(os.getenv("HOT_ZONES_TOP_N", "20"))
+    HOT_ZONES_MIN_SCORE = float(os.getenv("HOT_ZONES_MIN_SCORE", "3"))  # decayed requests before a zone is warmed
+    HOT_ZONES_HALF_LIFE = float(os.getenv("HOT_ZONES_HALF_LIFE", "1800"))
+    HOT_ZONES_WARM_INTERVAL = int(os.getenv("HOT_ZONES_WARM_INTERVAL", "120"))
+    HOT_ZONES_REFRESH_RATIO = float(os.getenv("HOT_ZONES_REFRESH_RATIO", "0.5"))  # re-warm after this share of the TTL
+    HOT_ZONES_CONCURRENCY = int(os.getenv("HOT_ZONES_CONCURRENCY", "4"))
+    HOT_ZONES_MAX_TRACKED = int(os.getenv("HOT_ZONES_MAX_TRACKED", "10000"))
+    
+    # ========== LATENCY BUDGET (seconds) ==========
+    # Whole-request deadline - stages degrade instead of overrunning. Kept below the frontend's 30s timeout.
+    LATENCY_BUDGET_DEFAULT = float(os.getenv("LATENCY_BUDGET_DEFAULT", "25.0"))
+    LATENCY_BUDGET_ENDPOINTS = os.getenv("LATENCY_BUDGET_ENDPOINTS", "recommend:25,recommend_stream:25,recommend_batch:120")
+    LATENCY_BUDGET_MAX = float(os.getenv("LATENCY_BUDGET_MAX", "120.0"))  # cap for a request's budget_ms
+    LATENCY_BUDGET_MIN_AI = float(os.getenv("LATENCY_BUDGET_MIN_AI", "1.0"))  # skip Gemini with less left
 
 settings = Settings()
 
@@ -1,6 +1,6 @@
 # app/db/neon_connection.py
 import uuid
-from sqlalchemy import ARRAY, create_engine, Column, String, Boolean, Text, DateTime, ForeignKey, Table, text
+from sqlalchemy import ARRAY, create_engine, Column, String, Boolean, Text, DateTime, Float, ForeignKey, Index, Integer, Table, text
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
@@ -51,6 +51,14 @@ class Rule(Base):
     recommended_categories = relationship("Category", secondary=rule_categories)
     trigger_category = relationship("Category", foreign_keys=[trigger_category_id])
 
+class RuleVersion(Base):
+    __tablename__ = "rule_versions"
+    
+    # Single row bumped by every admin write to categories, keywords or rules
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Menu(Base):
     __tablename__ = "menus"
     
@@ -77,6 +85,28 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+# ========== PLACE STORE MODELS ==========
+class StoredPlace(Base):
+    __tablename__ = "stored_places"
+    
+    place_id = Column(String(255), primary_key=True)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    data = Column(JSONB, nullable=False)
+    updated_at = Column(Float, nullable=False)
+    
+    __table_args__ = (Index("ix_stored_places_lat_lng", "lat", "lng"),)
+
+class PlaceTile(Base):
+    __tablename__ = "place_tiles"
+    
+    cell = Column(String(12), primary_key=True)
+    place_type = Column(String(50), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    place_ids = Column(ARRAY(String), nullable=False, default=[])
+    fetched_at = Column(Float, nullable=False)
+    last_accessed = Column(Float, nullable=False, index=True)
+
 
 
 # ========== NEON DATABASE CONNECTION ==========
@@ -688,6 +688,33 @@ async def lifespan(app: FastAPI):
     else:
         print("⚠️  Using development JWT secret - change in production!")
     
+    # Start background refresh of the persistent place store
+    try:
+        from app.services.place_store import place_store_refresher
+        if place_store_refresher:
+            place_store_refresher.start()
+            print("✅ Place store refresher started")
+    except Exception as e:
+        print(f"⚠️  Place store refresher not started: {e}")
+    
+    # Load database rules and keep them in sync with admin changes
+    try:
+        from app.services.rule_engine import rule_snapshot_poller
+        if rule_snapshot_poller:
+            rule_snapshot_poller.start()
+            print("✅ Rule snapshot poller started")
+    except Exception as e:
+        print(f"⚠️  Rule snapshot poller not started: {e}")
+    
+    # Precompute recommendations for the busiest neighbourhoods
+    try:
+        from app.services.hot_zones import hot_zones
+        if hot_zones:
+            hot_zones.start()
+            print("✅ Hot zone warmer started")
+    except Exception as e:
+        print(f"⚠️  Hot zone warmer not started: {e}")
+    
     print("\n🔗 IMPORTANT ENDPOINTS:")
     print("   📍 API Root:        http://localhost:8000/")
     print("   🔐 Authentication:  http://localhost:8000/auth/register")
@@ -698,6 +725,24 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("\n🛑 SERVER SHUTTING DOWN...")
+    try:
+        from app.services.place_store import place_store_refresher
+        if place_store_refresher:
+            await place_store_refresher.stop()
+    except Exception as e:
+        print(f"⚠️  Place store refresher shutdown error: {e}")
+    try:
+        from app.services.rule_engine import rule_snapshot_poller
+        if rule_snapshot_poller:
+            await rule_snapshot_poller.stop()
+    except Exception as e:
+        print(f"⚠️  Rule snapshot poller shutdown error: {e}")
+    try:
+        from app.services.hot_zones import hot_zones
+        if hot_zones:
+            await hot_zones.stop()
+    except Exception as e:
+        print(f"⚠️  Hot zone warmer shutdown error: {e}")
 
 app = FastAPI(
     title="Health Recommender AI",
@@ -2,11 +2,13 @@
 from .category_model import CategoryIn, CategoryOut
 from .keyword_model import KeywordIn, KeywordOut
 from .menu_model import MenuIn, MenuOut, MenuItem
+from .place_model import Place
 from .rule_model import RuleIn, RuleOut
 
 __all__ = [
     'CategoryIn', 'CategoryOut',
     'KeywordIn', 'KeywordOut',
     'MenuIn', 'MenuOut', 'MenuItem',
+    'Place',
     'RuleIn', 'RuleOut'
 ]
\ No newline at end of file
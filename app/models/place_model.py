@@ -0,0 +1,93 @@
+# app/models/place_model.py
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+import sys
+
+PRICE_LEVEL_TEXT = {0: 'Free', 1: 'Inexpensive', 2: 'Moderate', 3: 'Expensive', 4: 'Very Expensive'}
+
+
+@dataclass(slots=True)
+class Place:
+    """
+    Compact place carried through classification, distance and ranking.
+
+    Type strings are interned and the location is a plain (lat, lng) tuple;
+    only the response layer converts a Place to JSON with to_dict().
+    """
+    place_id: str
+    name: str
+    types: Tuple[str, ...]
+    location: Tuple[Optional[float], Optional[float]]
+    rating: float = 0
+    vicinity: str = 'Address not available'
+    price_level: Optional[int] = None
+    user_ratings_total: int = 0
+    search_source: str = ''
+    distance: Optional[int] = None
+    analysis: Optional[Dict[str, Any]] = None
+
+    @property
+    def lat(self) -> Optional[float]:
+        return self.location[0]
+
+    @property
+    def lng(self) -> Optional[float]:
+        return self.location[1]
+
+    @property
+    def price_level_text(self) -> str:
+        return PRICE_LEVEL_TEXT.get(self.price_level, 'Unknown')
+
+    @property
+    def distance_text(self) -> Optional[str]:
+        if self.distance is None:
+            return None
+        return f"{self.distance}m" if self.distance < 1000 else f"{self.distance/1000:.1f}km"
+
+    @classmethod
+    def from_google(cls, place: Dict[str, Any], place_type: str) -> "Place":
+        """Build from a raw Places API result"""
+        location = place.get('geometry', {}).get('location', {})
+        return cls(
+            place_id=place.get('place_id'),
+            name=place.get('name', 'Unknown'),
+            types=tuple(sys.intern(t) for t in place.get('types', [])),
+            location=(location.get('lat'), location.get('lng')),
+            rating=place.get('rating', 0),
+            vicinity=place.get('vicinity', 'Address not available'),
+            price_level=place.get('price_level'),
+            user_ratings_total=place.get('user_ratings_total', 0),
+            search_source=sys.intern(place_type)
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Place":
+        """Build from the JSON form produced by to_dict()"""
+        return cls.from_google(data, data.get('search_source', ''))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON form used in API responses and the place store"""
+        result = {
+            'place_id': self.place_id,
+            'name': self.name,
+            'types': list(self.types),
+            'rating': self.rating,
+            'vicinity': self.vicinity,
+            'geometry': {'location': {'lat': self.lat, 'lng': self.lng}},
+            'price_level': self.price_level,
+            'user_ratings_total': self.user_ratings_total,
+            'search_source': self.search_source,
+            'price_level_text': self.price_level_text
+        }
+        if self.distance is not None:
+            result['distance'] = self.distance
+            result['distance_text'] = self.distance_text
+        return result
+
+    def copy(self) -> "Place":
+        """Shallow copy for per-request annotations (distance, analysis)"""
+        return Place(
+            self.place_id, self.name, self.types, self.location, self.rating,
+            self.vicinity, self.price_level, self.user_ratings_total, self.search_source,
+            self.distance, self.analysis
+        )
@@ -128,6 +128,54 @@ async def test_neon_connection():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/rules-snapshot", response_model=dict)
+async def get_rules_snapshot():
+    """Version and size of the rule snapshot this worker classifies with, plus memo counters"""
+    from app.services.rule_engine import rule_engine
+    return {
+        "status": "success",
+        "snapshot": rule_engine.snapshot.stats(),
+        "memo": rule_engine.memo.stats()
+    }
+
+@router.post("/rules/reload", response_model=dict)
+async def reload_rules():
+    """Rebuild this worker's rule snapshot now instead of waiting for the poller"""
+    try:
+        import asyncio
+        from app.services.rule_engine import rule_engine
+        reloaded = await asyncio.to_thread(rule_engine.reload)
+        return {
+            "status": "success",
+            "reloaded": reloaded,
+            "snapshot": rule_engine.snapshot.stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/places-stats", response_model=dict)
+async def get_places_stats():
+    """Google Places cache and request-coalescing counters"""
+    try:
+        from app.services.google_service import google_service
+        return {
+            "status": "success",
+            "places": google_service.get_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/hot-zones", response_model=dict)
+async def get_hot_zones():
+    """Busiest request cells and response cache counters"""
+    from app.services.hot_zones import hot_zones
+    from app.services.response_cache import response_cache
+    return {
+        "status": "success",
+        "hot_zones": hot_zones.stats() if hot_zones else None,
+        "response_cache": response_cache.stats() if response_cache else None
+    }
+
 
 
 
@@ -3,26 +3,14 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, Dict, Any
 import logging
-import math
+
+from app.utils import geo
 
 logger = logging.getLogger(__name__)
 
 # Create router FIRST
 router = APIRouter(prefix="/api/locations", tags=["locations"])
 
-def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> int:
-    """Calculate distance between two coordinates in meters"""
-    try:
-        lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
-        dlat = lat2 - lat1
-        dlng = lng2 - lng1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        R = 6371000
-        return int(R * c)
-    except:
-        return 99999
-
 @router.get("/search")
 async def search_nearby_locations(
     lat: float = Query(..., description="Latitude"),
@@ -36,6 +24,7 @@ async def search_nearby_locations(
     try:
         # Import inside function to avoid circular imports
         from app.services.google_service import google_service
+        from app.services.rule_engine import rule_engine
         
         # Map search type to Google place types
         type_mapping = {
@@ -50,33 +39,36 @@ async def search_nearby_locations(
         place_types = type_mapping.get(search_type.lower(), ["restaurant", "cafe"])
         
         # Get places
-        places = google_service.get_nearby_places_by_types(
+        places = await google_service.get_nearby_places_by_types_async(
             lat=lat,
             lng=lng,
             radius=radius,
             place_types=place_types
         )
         
-        # Add distance to each place
-        for place in places:
-            place_lat = place.get('geometry', {}).get('location', {}).get('lat')
-            place_lng = place.get('geometry', {}).get('location', {}).get('lng')
-            
-            if place_lat and place_lng:
-                distance = calculate_distance(lat, lng, place_lat, place_lng)
-                place['distance'] = distance
-                place['distance_text'] = f"{distance}m" if distance < 1000 else f"{distance/1000:.1f}km"
+        # Add distance to each place - one vectorized call for the whole result
+        for place, distance in zip(places, geo.distances(lat, lng, places)):
+            if distance != geo.UNKNOWN_DISTANCE:
+                place.distance = distance
         
         # Sort by distance
-        places.sort(key=lambda x: x.get('distance', 99999))
+        places.sort(key=lambda x: 99999 if x.distance is None else x.distance)
+        
+        # Classify and convert to JSON only the places returned
+        top_places = places[:20]
+        batch = rule_engine.analyze_places(top_places)
+        top_places = [
+            {**place.to_dict(), 'category_id': category_id, 'is_unhealthy': is_unhealthy}
+            for place, category_id, is_unhealthy in zip(top_places, batch.category_ids, batch.unhealthy)
+        ]
         
         return {
             "status": "success",
             "location": {"lat": lat, "lng": lng, "radius": radius},
             "search_type": search_type,
             "count": len(places),
-            "places": places[:20],  # Limit to 20
-            "top_recommendations": places[:5]  # Top 5 closest
+            "places": top_places,  # Limit to 20
+            "top_recommendations": top_places[:5]  # Top 5 closest
         }
         
     except Exception as e:
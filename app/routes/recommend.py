@@ -96,12 +96,15 @@
 
 
 # app/routes/recommend.py
-from fastapi import APIRouter, HTTPException, Query, Depends
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from sqlalchemy.orm import Session
+import json
 
 from app.db.neon_connection import get_db, User
+from app.utils import deadline
 
 router = APIRouter(prefix="/api", tags=["recommendations"])
 
@@ -124,6 +127,69 @@ async def get_current_user_optional(
         return None
 
 
+def _user_context(context: Optional[str], current_user: Optional[User]) -> str:
+    """Request context plus the authenticated user's preferences"""
+    user_context = context or ""
+    if current_user:
+        # Add user-specific context
+        health_goals = getattr(current_user, 'health_goals', [])
+        dietary_prefs = getattr(current_user, 'dietary_preferences', [])
+        allergies = getattr(current_user, 'allergies', [])
+        
+        if health_goals:
+            user_context += f" User goals: {', '.join(health_goals)}."
+        if dietary_prefs:
+            user_context += f" Dietary preferences: {', '.join(dietary_prefs)}."
+        if allergies:
+            user_context += f" Allergies: {', '.join(allergies)}."
+    return user_context
+
+
+async def _recommend(
+    response: Response,
+    lat: float,
+    lng: float,
+    radius: int,
+    context: Optional[str],
+    user_context: str,
+    include_locations: bool,
+    include_menu: bool,
+    top_k: Optional[int],
+    budget_ms: Optional[int] = None
+) -> dict:
+    """
+    analyze_and_recommend within the request's latency budget, through the
+    response cache when enabled - sets X-Cache
+    """
+    from app.services.hot_zones import hot_zones
+    from app.services.recommend_service import recommendation_service
+    from app.services.response_cache import response_cache
+    
+    if hot_zones is not None:
+        hot_zones.record(lat, lng, radius, context, user_context, include_locations, include_menu, top_k)
+    
+    def compute():
+        return recommendation_service.analyze_and_recommend(
+            lat=lat,
+            lng=lng,
+            radius=radius,
+            user_context=user_context,
+            include_specific_locations=include_locations,
+            include_menu=include_menu,
+            top_k=top_k
+        )
+    
+    with deadline.latency_budget(deadline.budget_for("recommend", budget_ms)):
+        if response_cache is None:
+            return await compute()
+        
+        key = response_cache.key(lat, lng, radius, context, user_context, (include_locations, include_menu, top_k))
+        result, hit = await response_cache.get_or_compute(key, compute)
+    
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return result
+
+
 class LocationRequest(BaseModel):
     lat: float
     lng: float
@@ -131,6 +197,24 @@ class LocationRequest(BaseModel):
     context: Optional[str] = None
     include_locations: Optional[bool] = False
     include_menu: Optional[bool] = False
+    top_k: Optional[int] = Field(None, ge=1, le=20)
+    budget_ms: Optional[int] = Field(None, ge=100, le=120000)  # latency budget, defaults to the endpoint's
+
+
+class BatchLocation(BaseModel):
+    lat: float
+    lng: float
+    radius: Optional[int] = None  # defaults to the batch radius
+    context: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    locations: List[BatchLocation]
+    radius: int = Field(500, ge=100, le=5000)
+    context: Optional[str] = None
+    include_locations: Optional[bool] = False
+    top_k: Optional[int] = Field(None, ge=1, le=20)
+    budget_ms: Optional[int] = Field(None, ge=100, le=120000)  # for the whole batch
 
 
 # ========== PUBLIC ENDPOINTS (No Auth Required) ==========
@@ -143,6 +227,9 @@ async def get_recommendations(
     context: Optional[str] = Query(None, description="User context (morning, evening, workout)"),
     include_locations: bool = Query(False, description="Include specific location suggestions"),
     include_menu: bool = Query(False, description="Include menu information"),
+    top_k: Optional[int] = Query(None, ge=1, le=20, description="Number of ranked target places to return"),
+    budget_ms: Optional[int] = Query(None, ge=100, le=120000, description="Latency budget in milliseconds"),
+    response: Response = None,
     current_user: Optional[User] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
@@ -159,30 +246,11 @@ async def get_recommendations(
         )
     
     try:
-        from app.services.recommend_service import recommendation_service
-        
         # Get user preferences if authenticated
-        user_context = context or ""
-        if current_user:
-            # Add user-specific context
-            health_goals = getattr(current_user, 'health_goals', [])
-            dietary_prefs = getattr(current_user, 'dietary_preferences', [])
-            allergies = getattr(current_user, 'allergies', [])
-            
-            if health_goals:
-                user_context += f" User goals: {', '.join(health_goals)}."
-            if dietary_prefs:
-                user_context += f" Dietary preferences: {', '.join(dietary_prefs)}."
-            if allergies:
-                user_context += f" Allergies: {', '.join(allergies)}."
+        user_context = _user_context(context, current_user)
         
-        result = await recommendation_service.analyze_and_recommend(
-            lat=lat,
-            lng=lng,
-            radius=radius,
-            user_context=user_context,
-            include_specific_locations=include_locations,
-            include_menu=include_menu
+        result = await _recommend(
+            response, lat, lng, radius, context, user_context, include_locations, include_menu, top_k, budget_ms
         )
         
         # Add authentication status to response
@@ -199,6 +267,7 @@ async def get_recommendations(
 @router.post("/recommend", response_model=dict)
 async def get_recommendations_post(
     request: LocationRequest,
+    response: Response,
     current_user: Optional[User] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
@@ -215,29 +284,12 @@ async def get_recommendations_post(
         )
     
     try:
-        from app.services.recommend_service import recommendation_service
-        
         # Get user preferences if authenticated
-        user_context = request.context or ""
-        if current_user:
-            health_goals = getattr(current_user, 'health_goals', [])
-            dietary_prefs = getattr(current_user, 'dietary_preferences', [])
-            allergies = getattr(current_user, 'allergies', [])
-            
-            if health_goals:
-                user_context += f" User goals: {', '.join(health_goals)}."
-            if dietary_prefs:
-                user_context += f" Dietary preferences: {', '.join(dietary_prefs)}."
-            if allergies:
-                user_context += f" Allergies: {', '.join(allergies)}."
+        user_context = _user_context(request.context, current_user)
         
-        result = await recommendation_service.analyze_and_recommend(
-            lat=request.lat,
-            lng=request.lng,
-            radius=request.radius,
-            user_context=user_context,
-            include_specific_locations=request.include_locations,
-            include_menu=request.include_menu
+        result = await _recommend(
+            response, request.lat, request.lng, request.radius, request.context, user_context,
+            request.include_locations, request.include_menu, request.top_k, request.budget_ms
         )
         
         # Add authentication status
@@ -251,6 +303,119 @@ async def get_recommendations_post(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/recommend/batch", response_model=dict)
+async def get_recommendations_batch(
+    request: BatchRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """
+    Recommendations for many coordinates in one call
+    
+    Nearby locations share the cached per-type Places tiles. Results come
+    back in input order, each with its own status.
+    """
+    from app.config import settings
+    
+    if len(request.locations) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many locations (max {settings.BATCH_MAX_ITEMS})"
+        )
+    
+    try:
+        from app.services.recommend_service import recommendation_service
+        
+        user_context = _user_context(request.context, current_user)
+        
+        # Invalid items get their own status instead of failing the batch
+        results = [None] * len(request.locations)
+        valid_indices = []
+        for i, location in enumerate(request.locations):
+            if not (-90 <= location.lat <= 90) or not (-180 <= location.lng <= 180):
+                results[i] = {"index": i, "lat": location.lat, "lng": location.lng,
+                              "status": "invalid_coordinates", "message": "Invalid coordinates"}
+            elif location.radius is not None and not (100 <= location.radius <= 5000):
+                results[i] = {"index": i, "lat": location.lat, "lng": location.lng,
+                              "status": "invalid_radius", "message": "Radius must be between 100 and 5000 meters"}
+            else:
+                valid_indices.append(i)
+        
+        with deadline.latency_budget(deadline.budget_for("recommend_batch", request.budget_ms)):
+            batch_results = await recommendation_service.recommend_batch(
+                [request.locations[i].model_dump() for i in valid_indices],
+                radius=request.radius,
+                user_context=user_context,
+                include_specific_locations=request.include_locations,
+                top_k=request.top_k
+            )
+        for i, result in zip(valid_indices, batch_results):
+            results[i] = {**result, "index": i}
+        
+        return {
+            "status": "success",
+            "count": len(results),
+            "results": results,
+            "authenticated": current_user is not None
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/recommend/stream")
+async def stream_recommendations(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitude"),
+    radius: int = Query(500, ge=100, le=5000, description="Search radius in meters"),
+    context: Optional[str] = Query(None, description="User context (morning, evening, workout)"),
+    include_locations: bool = Query(False, description="Include specific location suggestions"),
+    include_menu: bool = Query(False, description="Include menu information"),
+    top_k: Optional[int] = Query(None, ge=1, le=20, description="Number of ranked target places to return"),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$", description="ndjson or sse (Server-Sent Events)"),
+    budget_ms: Optional[int] = Query(None, ge=100, le=120000, description="Latency budget in milliseconds"),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming version of /recommend
+    
+    Sends the detected place as soon as it is known, then healthy alternatives,
+    then the AI message, and finally the complete /recommend response as "result".
+    """
+    from app.services.recommend_service import recommendation_service
+    
+    user_context = _user_context(context, current_user)
+    
+    async def events():
+        stream = recommendation_service.stream_recommendation(
+            lat=lat,
+            lng=lng,
+            radius=radius,
+            user_context=user_context,
+            include_specific_locations=include_locations,
+            include_menu=include_menu,
+            top_k=top_k
+        )
+        with deadline.latency_budget(deadline.budget_for("recommend_stream", budget_ms)):
+            async for event, payload in stream:
+                if event == "result":
+                    payload['authenticated'] = current_user is not None
+                    if current_user:
+                        payload['user_email'] = current_user.email
+                
+                if format == "sse":
+                    yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                else:
+                    yield json.dumps({"event": event, **payload}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/test", response_model=dict)
 async def test_endpoint():
     """Test endpoint"""
@@ -2,7 +2,10 @@
 
 import google.generativeai as genai
 from app.config import settings
+from app.services.upstream_recorder import upstream_recorder
+from app.utils import deadline
 from typing import Dict, List, Optional, Any
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,7 +13,7 @@ logger = logging.getLogger(__name__)
 class AIService:
     def __init__(self):
         """Initialize Gemini AI with real API"""
-        if not settings.GEMINI_API_KEY:
+        if not settings.GEMINI_API_KEY and not upstream_recorder.replaying:
             raise ValueError("GEMINI_API_KEY is required")
         
         genai.configure(api_key=settings.GEMINI_API_KEY)
@@ -22,14 +25,19 @@ class AIService:
         trigger_place_name: str,
         trigger_category: str, 
         recommendations: List[str],
-        user_context: str = ""
+        user_context: str = "",
+        prompt_template: Optional[str] = None
     ) -> str:
         """
         Generate motivational message using Gemini AI
         """
         try:
+            guidance = self._rule_guidance(
+                prompt_template, trigger_category, ', '.join(recommendations) if recommendations else ''
+            )
             prompt = f"""
             You are a friendly health coach. A user is near {trigger_place_name} (a {trigger_category}).
+            {guidance}
             
             Available healthy alternatives nearby:
             {', '.join(recommendations) if recommendations else 'Various healthy options'}
@@ -44,8 +52,7 @@ class AIService:
             
             logger.info(f"🤖 Generating AI message for: {trigger_place_name} ({trigger_category})")
             
-            response = await self.model.generate_content_async(prompt)
-            message = response.text.strip()
+            message = await self._generate_text(prompt)
             
             logger.debug(f"AI Response: {message}")
             return message
@@ -60,7 +67,8 @@ class AIService:
         trigger_place_name: str,
         trigger_category: str,
         specific_alternatives: List[Dict[str, Any]],
-        user_context: str = ""
+        user_context: str = "",
+        prompt_template: Optional[str] = None
     ) -> str:
         """
         Generate motivational message WITH specific location suggestions
@@ -68,12 +76,16 @@ class AIService:
         try:
             # Format alternatives for prompt
             alternatives_text = self._format_alternatives_for_ai(specific_alternatives)
+            guidance = self._rule_guidance(
+                prompt_template, trigger_category, ', '.join(alt.get('name', '') for alt in specific_alternatives)
+            )
             
             prompt = f"""
             You are a friendly health coach in Pakistan. 
             
             Current Situation:
             - User is near: {trigger_place_name} (a {trigger_category})
+            {guidance}
             
             ACTUAL healthy alternatives available NEARBY:
             {alternatives_text}
@@ -95,8 +107,7 @@ class AIService:
             
             logger.info(f"🤖 Generating AI message with locations for: {trigger_place_name}")
             
-            response = await self.model.generate_content_async(prompt)
-            message = response.text.strip()
+            message = await self._generate_text(prompt)
             
             logger.debug(f"AI Response with locations: {message}")
             return message
@@ -124,6 +135,39 @@ class AIService:
                 return f"Skip {trigger_place_name}! Try {', '.join(messages)} for healthier options! 🥗"
             return f"Consider a healthy alternative instead of {trigger_place_name}!"
     
+    async def _generate_text(self, prompt: str) -> str:
+        """
+        Gemini call routed through the upstream record/replay transport.
+        Bounded by the request's latency budget - callers fall back to template messages.
+        """
+        async def generate() -> str:
+            response = await self.model.generate_content_async(prompt)
+            return response.text.strip()
+        
+        if deadline.exhausted(reserve=settings.LATENCY_BUDGET_MIN_AI):
+            raise deadline.BudgetExceeded("Not enough latency budget left for Gemini")
+        
+        async with asyncio.timeout(deadline.remaining()):
+            return await upstream_recorder.call(
+                'gemini',
+                'generate_content',
+                {"model": settings.GEMINI_MODEL, "prompt": prompt},
+                generate
+            )
+    
+    @staticmethod
+    def _rule_guidance(prompt_template: Optional[str], trigger_category: str, alternatives: str) -> str:
+        """Admin-defined rule prompt, with {trigger_category} and {alternatives} filled in"""
+        if not prompt_template:
+            return ""
+        
+        values = {"trigger_category": trigger_category, "alternatives": alternatives or "healthy options"}
+        try:
+            return "Rule guidance: " + prompt_template.format_map(values)
+        except (KeyError, IndexError, ValueError):
+            # Unknown placeholders - use the template as written
+            return "Rule guidance: " + prompt_template
+    
     def _format_alternatives_for_ai(self, alternatives: List[Dict[str, Any]]) -> str:
         """Format alternatives for AI prompt - SIMPLER VERSION"""
         if not alternatives:
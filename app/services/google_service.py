@@ -1,132 +1,400 @@
 
 import googlemaps
 from app.config import settings
-from typing import List, Dict, Optional, Any, Tuple
+from app.models.place_model import Place
+from app.services.healthy_index import healthy_index
+from app.services.places_cache import places_cache
+from app.services.quota_governor import quota_governor
+from app.services.upstream_recorder import ReplayedError, upstream_recorder
+from app.utils import deadline
+from app.utils.singleflight import SingleFlight
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Any, Tuple
+import asyncio
+import functools
 import logging
-import time
+import math
 
 logger = logging.getLogger(__name__)
 
+# Places returns at most 20 results per page; only full pages have a next page
+PLACES_PAGE_SIZE = 20
+
 class GoogleMapsService:
     def __init__(self):
         """Initialize Google Maps client"""
-        if not settings.GOOGLE_API_KEY:
+        if not settings.GOOGLE_API_KEY and not upstream_recorder.replaying:
             raise ValueError("GOOGLE_API_KEY is required")
         
-        self.client = googlemaps.Client(key=settings.GOOGLE_API_KEY)
+        # Rate limiting and OVER_QUERY_LIMIT backoff are handled by the quota governor
+        self.client = None
+        if settings.GOOGLE_API_KEY:
+            self.client = googlemaps.Client(key=settings.GOOGLE_API_KEY, retry_over_query_limit=False)
+        self.in_flight = SingleFlight()
+        # Slow upstream calls must not starve to_thread work (e.g. place store fallbacks)
+        self.executor = ThreadPoolExecutor(settings.PLACES_UPSTREAM_THREADS, thread_name_prefix="places")
         logger.info("✅ Google Maps API initialized")
     
-    def get_nearby_places_by_types(
-        self, 
-        lat: float, 
-        lng: float, 
+    async def get_nearby_places_by_types_async(
+        self,
+        lat: float,
+        lng: float,
         radius: int = 500,
-        place_types: List[str] = None
-    ) -> List[Dict[str, Any]]:
+        place_types: List[str] = None,
+        max_concurrency: Optional[int] = None
+    ) -> List[Place]:
         """
-        Get nearby places - ONLY restaurants, cafes, gyms, bars
+        Get nearby places - ONLY restaurants, cafes, gyms, bars - searching all types concurrently
         """
-        # ONLY search for these types
         if place_types is None:
             place_types = ['restaurant', 'cafe', 'gym', 'bar', 'food', 'meal_takeaway']
         
-        all_places = []
+        semaphore = asyncio.Semaphore(max_concurrency or settings.PLACES_MAX_CONCURRENCY)
+        
+        async def search(place_type: str) -> List[Place]:
+            async with semaphore:
+                return await self._search_type_async(lat, lng, radius, place_type)
+        
+        # Merge and dedupe as each type's results arrive
+        unique_places = []
+        seen_ids = set()
+        
+        for next_done in asyncio.as_completed([search(t) for t in place_types]):
+            for place in await next_done:
+                place_id = place.place_id
+                if place_id and place_id not in seen_ids:
+                    seen_ids.add(place_id)
+                    unique_places.append(place)
+        
+        logger.info(f"📍 Total restaurants/cafes/gyms found: {len(unique_places)}")
+        return unique_places
+    
+    async def get_nearby_places_by_types_adaptive(
+        self,
+        lat: float,
+        lng: float,
+        radius: int = 500,
+        place_types: List[str] = None,
+        min_results: int = 10,
+        accept: Optional[Callable[[Place], bool]] = None
+    ) -> Tuple[List[Place], int]:
+        """
+        Iterative-deepening search: start small and grow the radius until
+        min_results accepted places are found or the full radius is reached.
+        
+        Each level's count sizes the next one - assuming even density, the radius
+        grows by sqrt(min_results / accepted) (at least the growth factor), and an
+        empty level jumps straight to the full radius - so sparse areas take two
+        rounds rather than one per doubling. Places from earlier levels are kept.
+        Returns the places and the radius actually searched.
+        """
+        accept = accept or (lambda place: True)
+        search_radius = min(settings.PLACES_ADAPTIVE_START_RADIUS, radius)
+        places = []
+        seen_ids = set()
+        
+        while True:
+            for place in await self.get_nearby_places_by_types_async(lat, lng, search_radius, place_types):
+                if place.place_id not in seen_ids:
+                    seen_ids.add(place.place_id)
+                    places.append(place)
+            accepted = sum(1 for place in places if accept(place))
+            
+            if accepted >= min_results or search_radius >= radius or deadline.exhausted():
+                logger.info(f"🎯 Adaptive search stopped at {search_radius}m with {accepted} accepted places")
+                return places, search_radius
+            
+            if accepted == 0:
+                search_radius = radius
+            else:
+                growth = max(math.sqrt(min_results / accepted), settings.PLACES_ADAPTIVE_GROWTH)
+                search_radius = min(int(search_radius * growth), radius)
+    
+    async def _search_type_async(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_type: str
+    ) -> List[Place]:
+        """Search a single place type without blocking the event loop"""
+        try:
+            # Only this request stops waiting at its budget - the shared upstream call carries on
+            async with asyncio.timeout(deadline.remaining()):
+                if settings.PLACES_CACHE_ENABLED:
+                    places = await places_cache.get_nearby(lat, lng, radius, place_type, self.fetch_tile)
+                else:
+                    places = await self._fetch_places(lat, lng, radius, place_type)
+            
+            if healthy_index is not None:
+                healthy_index.add(places)
+            
+            # Cached and coalesced results are shared - hand out copies
+            return [place.copy() for place in places]
+            
+        except TimeoutError:
+            logger.warning(f"⏱️ {place_type} search stopped at the latency budget")
+            return []
+        except Exception as e:
+            logger.error(f"Error searching {place_type}: {e}")
+            return []
+    
+    async def fetch_tile(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_type: str
+    ) -> Tuple[List[Place], Optional[Callable[[], Awaitable[List[Place]]]]]:
+        """
+        Fetch one places cache tile from upstream.
+        Returns the first page, and - when it came back full - a callable fetching
+        the follow-up pages. Page tokens need a delay before they are valid, so
+        callers run it off the request path.
+        """
+        pages = self.iter_nearby_places(lat, lng, radius, place_type, settings.PLACES_MAX_PAGES)
+        first_page = await anext(pages, [])
+        if len(first_page) < PLACES_PAGE_SIZE:
+            await pages.aclose()
+            return first_page, None
         
-        for place_type in place_types:
+        async def more_pages() -> List[Place]:
+            places = []
             try:
-                logger.info(f"🔍 Searching for {place_type} near ({lat}, {lng})")
-                
-                places_result = self.client.places_nearby(
+                async for page in pages:
+                    places.extend(page)
+            except Exception as e:
+                logger.warning(f"Stopped paging {place_type} after {len(first_page) + len(places)} places: {e}")
+            return places
+        
+        return first_page, more_pages
+    
+    async def _fetch_places(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_type: str
+    ) -> List[Place]:
+        """Fetch one type, sharing the upstream call with identical in-flight lookups"""
+        key = (round(lat, 5), round(lng, 5), int(radius), place_type)
+        return await self.in_flight.do(
+            key,
+            lambda: self._request_places(lat, lng, radius, place_type)
+        )
+    
+    async def _request_places(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_type: str
+    ) -> List[Place]:
+        """Call the Places API for one type - errors propagate to the caller"""
+        logger.info(f"🔍 Searching for {place_type} near ({lat}, {lng})")
+        
+        places_result = await self._places_nearby(
+            location=(lat, lng),
+            radius=radius,
+            type=place_type,
+            language='en'
+        )
+        
+        places = places_result.get('results', [])
+        logger.info(f"   Found {len(places)} {place_type}(s)")
+        
+        return [self._enrich_place(place, place_type) for place in places]
+    
+    async def _places_nearby(self, **params) -> Dict[str, Any]:
+        """Raw places_nearby call, paced by the shared quota governor"""
+        api_key = settings.GOOGLE_API_KEY
+        if not upstream_recorder.replaying:
+            await quota_governor.acquire(api_key)
+        
+        try:
+            # googlemaps is a blocking client - run it on the dedicated upstream threads
+            loop = asyncio.get_running_loop()
+            result = await upstream_recorder.call(
+                'google_maps',
+                'places_nearby',
+                params,
+                lambda: loop.run_in_executor(self.executor, functools.partial(self.client.places_nearby, **params))
+            )
+        except (googlemaps.exceptions.ApiError, ReplayedError) as e:
+            if e.status == 'OVER_QUERY_LIMIT':
+                quota_governor.report_over_limit(api_key)
+            raise
+        
+        quota_governor.report_success(api_key)
+        return result
+    
+    async def iter_nearby_places(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_type: str,
+        max_pages: Optional[int] = None
+    ) -> AsyncIterator[List[Place]]:
+        """
+        Yield enriched places page by page, following next_page_token.
+        Stop iterating to skip the remaining pages.
+        """
+        max_pages = max_pages or settings.PLACES_MAX_PAGES
+        page_token = None
+        
+        for page in range(max_pages):
+            if page_token is None:
+                logger.info(f"🔍 Searching for {place_type} near ({lat}, {lng}), radius {radius}m")
+                places_result = await self._places_nearby(
                     location=(lat, lng),
                     radius=radius,
                     type=place_type,
                     language='en'
                 )
-                
-                places = places_result.get('results', [])
-                
-                for place in places:
-                    enriched = self._enrich_place(place, place_type)
-                    all_places.append(enriched)
-                
-                logger.info(f"   Found {len(places)} {place_type}(s)")
-                time.sleep(0.1)
-                
+            else:
+                if deadline.exhausted(reserve=settings.PLACES_PAGE_TOKEN_DELAY):
+                    logger.info(f"⏱️ Latency budget low - skipping remaining {place_type} pages")
+                    return
+                places_result = await self._next_page(page_token)
+            
+            places = [self._enrich_place(place, place_type) for place in places_result.get('results', [])]
+            logger.info(f"   Page {page + 1}: {len(places)} {place_type}(s)")
+            yield places
+            
+            page_token = places_result.get('next_page_token')
+            if not page_token:
+                return
+    
+    async def _next_page(self, page_token: str) -> Dict[str, Any]:
+        """Fetch a follow-up page once its token becomes active"""
+        # Tokens are not valid until a short delay after they are issued
+        await asyncio.sleep(settings.PLACES_PAGE_TOKEN_DELAY)
+        
+        for attempt in range(settings.PLACES_PAGE_TOKEN_RETRIES):
+            try:
+                return await self._places_nearby(page_token=page_token)
+            except (googlemaps.exceptions.ApiError, ReplayedError) as e:
+                if e.status != 'INVALID_REQUEST' or attempt == settings.PLACES_PAGE_TOKEN_RETRIES - 1:
+                    raise
+                await asyncio.sleep(1)
+    
+    async def stream_nearby_places_by_types(
+        self,
+        lat: float,
+        lng: float,
+        radius: int = 500,
+        place_types: List[str] = None,
+        max_pages: Optional[int] = None
+    ) -> AsyncIterator[Tuple[List[Place], bool]]:
+        """
+        Yield (new deduped places, whether every type's first page is in) as pages arrive.
+        Pending pages are cancelled when the caller stops iterating.
+        """
+        if place_types is None:
+            place_types = ['restaurant', 'cafe', 'gym', 'bar', 'food', 'meal_takeaway']
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        async def produce(place_type: str):
+            try:
+                pages = self.iter_nearby_places(lat, lng, radius, place_type, max_pages)
+                async for page in pages:
+                    if healthy_index is not None:
+                        healthy_index.add(page)
+                    await queue.put((place_type, page))
             except Exception as e:
-                logger.error(f"Error searching {place_type}: {e}")
-                continue
+                logger.error(f"Error paging {place_type}: {e}")
+            finally:
+                await queue.put((place_type, done))
         
-        # Remove duplicates
-        unique_places = []
+        tasks = [asyncio.create_task(produce(t)) for t in place_types]
         seen_ids = set()
+        remaining = len(tasks)
+        # A type that fails or finishes without results counts as answered
+        awaiting_first = set(place_types)
         
-        for place in all_places:
-            place_id = place.get('place_id')
-            if place_id and place_id not in seen_ids:
-                seen_ids.add(place_id)
-                unique_places.append(place)
-        
-        logger.info(f"📍 Total restaurants/cafes/gyms found: {len(unique_places)}")
-        return unique_places
+        try:
+            while remaining:
+                place_type, page = await queue.get()
+                was_awaiting = bool(awaiting_first)
+                awaiting_first.discard(place_type)
+                
+                new_places = []
+                if page is done:
+                    remaining -= 1
+                else:
+                    for place in page:
+                        place_id = place.place_id
+                        if place_id and place_id not in seen_ids:
+                            seen_ids.add(place_id)
+                            new_places.append(place)
+                
+                # Also report the moment the last first page lands, even without new places
+                if new_places or (was_awaiting and not awaiting_first):
+                    yield new_places, not awaiting_first
+        finally:
+            for task in tasks:
+                task.cancel()
     
-    def _enrich_place(self, place: Dict, place_type: str) -> Dict[str, Any]:
-        """Enrich place data"""
-        result = {
-            'place_id': place.get('place_id'),
-            'name': place.get('name', 'Unknown'),
-            'types': place.get('types', []),
-            'rating': place.get('rating', 0),
-            'vicinity': place.get('vicinity', 'Address not available'),
-            'geometry': place.get('geometry', {}),
-            'price_level': place.get('price_level'),
-            'user_ratings_total': place.get('user_ratings_total', 0),
-            'search_source': place_type
+    def get_stats(self) -> Dict[str, Any]:
+        """Upstream coalescing and cache counters"""
+        return {
+            "coalescing": self.in_flight.stats(),
+            "cache": places_cache.stats(),
+            "quota": quota_governor.stats()
         }
-        
-        # Price level
-        price_map = {0: 'Free', 1: 'Inexpensive', 2: 'Moderate', 3: 'Expensive', 4: 'Very Expensive'}
-        result['price_level_text'] = price_map.get(result['price_level'], 'Unknown')
-        
-        return result
     
-    def get_healthy_alternatives_nearby(
+    def _enrich_place(self, place: Dict, place_type: str) -> Place:
+        """Enrich place data"""
+        return Place.from_google(place, place_type)
+    
+    async def get_healthy_alternatives_nearby_async(
         self,
         lat: float,
         lng: float,
         radius: int = 500
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Place]:
         """
-        Get healthy alternatives nearby - ONLY cafes, gyms, healthy restaurants
+        Get healthy alternatives nearby - ONLY cafes, gyms, healthy restaurants - searched concurrently
         """
         try:
-            # Search for healthy places
-            healthy_types = ['cafe', 'gym', 'food']  # Only these
+            healthy_types = ['cafe', 'gym', 'food']
+            
+            results = await asyncio.gather(*[
+                self.get_nearby_places_by_types_async(lat, lng, radius, [h_type])
+                for h_type in healthy_types
+            ])
             
             all_places = []
-            for h_type in healthy_types:
-                places = self.get_nearby_places_by_types(lat, lng, radius, [h_type])
+            for places in results:
                 all_places.extend(places[:5])  # Get top 5 per type
             
-            # Filter for healthy names
-            healthy_places = []
-            for place in all_places:
-                name = place.get('name', '').lower()
-                
-                # Skip unhealthy names
-                if any(word in name for word in ['fast food', 'fried', 'burger', 'pizza', 'kfc', 'mcdonald']):
-                    continue
-                
-                # Prefer healthy names
-                if any(word in name for word in ['cafe', 'coffee', 'healthy', 'salad', 'juice', 'smoothie', 'gym', 'fitness']):
-                    healthy_places.append(place)
-                elif place.get('rating', 0) >= 4.0:  # High-rated places
-                    healthy_places.append(place)
-            
-            return healthy_places[:10]  # Return top 10
+            return self.filter_healthy_places(all_places)[:10]
             
         except Exception as e:
             logger.error(f"Error getting healthy alternatives: {e}")
             return []
+    
+    @staticmethod
+    def filter_healthy_places(places: List[Place]) -> List[Place]:
+        """Keep places with healthy names or high ratings"""
+        healthy_places = []
+        for place in places:
+            name = place.name.lower()
+            
+            # Skip unhealthy names
+            if any(word in name for word in ['fast food', 'fried', 'burger', 'pizza', 'kfc', 'mcdonald']):
+                continue
+            
+            # Prefer healthy names
+            if any(word in name for word in ['cafe', 'coffee', 'healthy', 'salad', 'juice', 'smoothie', 'gym', 'fitness']):
+                healthy_places.append(place)
+            elif (place.rating or 0) >= 4.0:  # High-rated places
+                healthy_places.append(place)
+        
+        return healthy_places
 
 # Singleton instance
 google_service = GoogleMapsService()
\ No newline at end of file
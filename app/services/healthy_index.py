@@ -0,0 +1,126 @@
+# app/services/healthy_index.py
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import threading
+
+import numpy as np
+
+from app.config import settings
+from app.models.place_model import Place
+from app.services.place_pool import HEALTHY_PLACE_TYPES
+from app.utils import geo
+
+logger = logging.getLogger(__name__)
+
+# First ring searched by nearest(); doubled until enough places are found
+NEAREST_START_RADIUS = 250
+
+
+class HealthyPlaceIndex:
+    """
+    In-memory geohash grid of known healthy places.
+
+    Updated incrementally with every batch of fetched places, so alternative
+    lookups are answered from memory instead of new Places searches.
+    Entries are bounded by HEALTHY_INDEX_MAX_PLACES, least recently seen first out.
+    """
+
+    def __init__(self):
+        self.precision = settings.HEALTHY_INDEX_PRECISION
+        self.max_places = settings.HEALTHY_INDEX_MAX_PLACES
+        self.healthy_types = frozenset(HEALTHY_PLACE_TYPES)
+
+        self._cells: Dict[str, Dict[str, Place]] = {}
+        self._cell_of: "OrderedDict[str, str]" = OrderedDict()  # place_id -> cell, LRU order
+        self._lock = threading.Lock()
+        self._stats = {"added": 0, "removed": 0, "evictions": 0, "queries": 0}
+        logger.info("✅ HealthyPlaceIndex initialized")
+
+    def add(self, places: Iterable[Place]):
+        """Index healthy places from a fetched batch; drop ones that no longer qualify"""
+        from app.services.google_service import GoogleMapsService
+        from app.services.rule_engine import rule_engine
+
+        places = [p for p in places if p.place_id and p.lat is not None and p.lng is not None]
+        unhealthy = rule_engine.snapshot.unhealthy
+        candidates = [
+            p for p in places
+            if not self.healthy_types.isdisjoint(p.types) and rule_engine.classify_place(p) not in unhealthy
+        ]
+        healthy_ids = {p.place_id for p in GoogleMapsService.filter_healthy_places(candidates)}
+
+        with self._lock:
+            for place in places:
+                if place.place_id in healthy_ids:
+                    self._put(place)
+                elif place.place_id in self._cell_of:
+                    self._remove(place.place_id)
+                    self._stats["removed"] += 1
+
+            while len(self._cell_of) > self.max_places:
+                self._remove(next(iter(self._cell_of)))
+                self._stats["evictions"] += 1
+
+    def within(self, lat: float, lng: float, radius: float, limit: Optional[int] = None) -> List[Place]:
+        """Indexed places within radius, nearest first, as copies with distance set"""
+        cells = geo.geohash_cover(lat, lng, radius, self.precision)
+
+        with self._lock:
+            self._stats["queries"] += 1
+            candidates = [place for cell in cells for place in self._cells.get(cell, {}).values()]
+
+        distances = geo.haversine_many(lat, lng, *geo.coordinates(candidates))
+        results = []
+        for i in np.argsort(distances, kind="stable"):
+            if distances[i] > radius or (limit and len(results) >= limit):
+                break
+            place = candidates[i].copy()
+            place.distance = int(distances[i])
+            results.append(place)
+
+        return results
+
+    def nearest(self, lat: float, lng: float, k: int, max_radius: float) -> List[Place]:
+        """Up to k nearest indexed places within max_radius - small rings first"""
+        radius = min(NEAREST_START_RADIUS, max_radius)
+        while True:
+            # Every place within radius is returned, so the first k are the true nearest
+            results = self.within(lat, lng, radius, limit=k)
+            if len(results) >= k or radius >= max_radius:
+                return results
+            radius = min(radius * 2, max_radius)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "places": len(self._cell_of), "cells": len(self._cells)}
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+            self._cell_of.clear()
+
+    def _put(self, place: Place):
+        cell = geo.geohash_encode(place.lat, place.lng, self.precision)
+        previous = self._cell_of.get(place.place_id)
+        if previous is None:
+            self._stats["added"] += 1
+        elif previous != cell:
+            self._remove(place.place_id)
+
+        # Stored without per-request annotations
+        stored = place.copy()
+        stored.distance = None
+        stored.analysis = None
+        self._cells.setdefault(cell, {})[place.place_id] = stored
+        self._cell_of[place.place_id] = cell
+        self._cell_of.move_to_end(place.place_id)
+
+    def _remove(self, place_id: str):
+        cell = self._cell_of.pop(place_id)
+        entries = self._cells[cell]
+        entries.pop(place_id, None)
+        if not entries:
+            del self._cells[cell]
+
+# Singleton instance
+healthy_index = HealthyPlaceIndex() if settings.HEALTHY_INDEX_ENABLED else None
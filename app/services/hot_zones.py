@@ -0,0 +1,165 @@
+# app/services/hot_zones.py
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import logging
+import time
+
+from app.config import settings
+from app.services.places_cache import PlacesCache
+from app.utils import geo
+
+logger = logging.getLogger(__name__)
+
+# (geohash cell, radius bucket, context, user context, include_locations, include_menu, top_k)
+Variant = Tuple[str, int, str, str, bool, bool, Optional[int]]
+
+
+class HotZoneTracker:
+    """
+    Request density per geohash cell, with a background job warming the hottest cells.
+
+    Each request variant's count decays with HOT_ZONES_HALF_LIFE, so the ranking
+    follows current traffic. Warming runs the full pipeline at the cell center:
+    with the response cache enabled the whole response is stored, otherwise
+    Places results and classifications are warmed.
+    """
+
+    def __init__(self):
+        # Same cells as the response cache, so a warmed response serves the whole cell
+        self.precision = settings.RESPONSE_CACHE_PRECISION
+        self.half_life = settings.HOT_ZONES_HALF_LIFE
+        self.max_tracked = settings.HOT_ZONES_MAX_TRACKED
+
+        self._scores: Dict[Variant, Tuple[float, float]] = {}  # variant -> (score, updated_at)
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"recorded": 0, "warmed": 0, "skipped_fresh": 0, "warm_errors": 0}
+        logger.info("✅ HotZoneTracker initialized")
+
+    def record(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        context: Optional[str],
+        user_context: str,
+        include_locations: bool = False,
+        include_menu: bool = False,
+        top_k: Optional[int] = None
+    ):
+        """Count one request"""
+        variant = (
+            geo.geohash_encode(lat, lng, self.precision),
+            PlacesCache.radius_bucket(radius),
+            (context or "").strip().lower(),
+            user_context,
+            bool(include_locations),
+            bool(include_menu),
+            top_k
+        )
+        now = time.monotonic()
+        self._scores[variant] = (self._decayed(variant, now) + 1, now)
+        self._stats["recorded"] += 1
+
+        if len(self._scores) > self.max_tracked:
+            # Forget the coldest fifth in one pass
+            keep = heapq.nlargest(int(self.max_tracked * 0.8), self._scores, key=lambda v: self._decayed(v, now))
+            self._scores = {v: self._scores[v] for v in keep}
+
+    def hottest(self, n: int) -> List[Tuple[Variant, float]]:
+        """Top-n variants by decayed request count"""
+        now = time.monotonic()
+        scored = ((variant, self._decayed(variant, now)) for variant in self._scores)
+        return heapq.nlargest(n, scored, key=lambda item: item[1])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "tracked": len(self._scores),
+            "hottest": [
+                {"cell": variant[0], "radius": variant[1], "context": variant[2], "score": round(score, 2)}
+                for variant, score in self.hottest(5)
+            ]
+        }
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("🔥 Hot zone warmer started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.HOT_ZONES_WARM_INTERVAL)
+            try:
+                await self.warm_once()
+            except Exception as e:
+                logger.error(f"Hot zone warming failed: {e}")
+
+    async def warm_once(self) -> int:
+        """Warm the top-N variants that are not already fresh in cache"""
+        semaphore = asyncio.Semaphore(max(settings.HOT_ZONES_CONCURRENCY, 1))
+
+        async def warm(variant: Variant) -> bool:
+            async with semaphore:
+                try:
+                    return await self._warm(variant)
+                except Exception as e:
+                    self._stats["warm_errors"] += 1
+                    logger.error(f"Warming {variant[0]} failed: {e}")
+                    return False
+
+        hottest = [variant for variant, score in self.hottest(settings.HOT_ZONES_TOP_N) if score >= settings.HOT_ZONES_MIN_SCORE]
+        warmed = sum(await asyncio.gather(*[warm(variant) for variant in hottest]))
+        if warmed:
+            logger.info(f"🔥 Warmed {warmed}/{len(hottest)} hot zones")
+        return warmed
+
+    async def _warm(self, variant: Variant) -> bool:
+        from app.services.place_pool import PlacePool
+        from app.services.recommend_service import recommendation_service
+        from app.services.response_cache import response_cache
+        from app.services.rule_engine import rule_engine
+
+        cell, radius, context, user_context, include_locations, include_menu, top_k = variant
+        lat, lng = geo.geohash_center(cell)
+
+        if response_cache is None:
+            # No response cache - warm the Places tiles and classification memo only
+            pool = PlacePool(lat, lng, radius)
+            rule_engine.analyze_places(await pool.load())
+            self._stats["warmed"] += 1
+            return True
+
+        key = response_cache.key(lat, lng, radius, context, user_context, (include_locations, include_menu, top_k))
+        age = response_cache.age(key)
+        if age is not None and age < response_cache.ttl * settings.HOT_ZONES_REFRESH_RATIO:
+            self._stats["skipped_fresh"] += 1
+            return False
+
+        await response_cache.refresh(key, lambda: recommendation_service.analyze_and_recommend(
+            lat=lat,
+            lng=lng,
+            radius=radius,
+            user_context=user_context,
+            include_specific_locations=include_locations,
+            include_menu=include_menu,
+            top_k=top_k
+        ))
+        self._stats["warmed"] += 1
+        return True
+
+    def _decayed(self, variant: Variant, now: float) -> float:
+        score, updated_at = self._scores.get(variant, (0.0, now))
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+# Singleton instance
+hot_zones = HotZoneTracker() if settings.HOT_ZONES_ENABLED else None
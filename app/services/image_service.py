@@ -10,6 +10,7 @@ import base64
 import urllib.parse
 from typing import List, Dict, Optional, Any
 from app.config import settings
+from app.utils import geo
 
 # Try to import optional services
 try:
@@ -257,23 +258,21 @@ class ImageAnalysisService:
             
             logger.info(f"Searching healthy places near ({lat}, {lng})")
             
-            # Get places
-            places = google_service.get_healthy_alternatives_nearby(lat, lng, radius)
+            # Nearest indexed healthy places - search Google only if the area is not indexed yet
+            from app.services.healthy_index import healthy_index
+            
+            places = healthy_index.nearest(lat, lng, k=3, max_radius=radius) if healthy_index is not None else []
+            if len(places) < 3:
+                places = await google_service.get_healthy_alternatives_nearby_async(lat, lng, radius)
             
             if not places:
                 return []
             
             alternatives = []
-            for place in places[:3]:
-                # Get location
-                place_lat = place.get('geometry', {}).get('location', {}).get('lat')
-                place_lng = place.get('geometry', {}).get('location', {}).get('lng')
-                
-                # Calculate distance
-                distance = random.randint(200, 1500)
-                
+            top_places = places[:3]
+            for place, distance in zip(top_places, geo.distances(lat, lng, top_places)):
                 # Determine category
-                name = place.get('name', '').lower()
+                name = place.name.lower()
                 
                 if 'gym' in name or 'fitness' in name:
                     category = 'Gym'
@@ -287,13 +286,13 @@ class ImageAnalysisService:
                     category = 'Place'
                 
                 alternatives.append({
-                    'name': place.get('name'),
+                    'name': place.name,
                     'category': category,
-                    'rating': place.get('rating', random.uniform(3.5, 4.8)),
-                    'vicinity': place.get('vicinity', 'Address not available'),
+                    'rating': place.rating,
+                    'vicinity': place.vicinity,
                     'distance': distance,
                     'distance_text': f"{distance}m" if distance < 1000 else f"{distance/1000:.1f}km",
-                    'price_level': place.get('price_level_text', '$$'),
+                    'price_level': place.price_level_text,
                     'health_focus': 'Healthy options available'
                 })
             
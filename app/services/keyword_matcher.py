@@ -0,0 +1,176 @@
+# app/services/keyword_matcher.py
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword set.
+
+    Each keyword carries a priority (lower wins). match() scans the text once
+    and returns the matched keyword with the best priority, so results do not
+    depend on the order keywords were added in.
+    """
+
+    NO_MATCH = -1
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        self.keywords: List[str] = []
+        self.priorities: List[int] = []
+
+        # State 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[int] = [self.NO_MATCH]  # best keyword index ending at (or via fail links of) a state
+
+        for keyword, priority in keywords:
+            self._add(keyword.lower(), priority)
+        self._build_fail_links()
+        self._top_priority = min(self.priorities, default=0)
+
+        logger.debug(f"KeywordMatcher compiled {len(self.keywords)} keywords into {len(self._goto)} states")
+
+    def _add(self, keyword: str, priority: int):
+        if not keyword:
+            return
+
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(self.NO_MATCH)
+            state = next_state
+
+        index = len(self.keywords)
+        self.keywords.append(keyword)
+        self.priorities.append(priority)
+        if self._better(index, self._best[state]):
+            self._best[state] = index
+
+    def _better(self, index: int, current: int) -> bool:
+        return current == self.NO_MATCH or self.priorities[index] < self.priorities[current]
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail if fail != next_state else 0
+
+                # Fold the suffix state's best match into this state (BFS order guarantees it is final)
+                inherited = self._best[self._fail[next_state]]
+                if inherited != self.NO_MATCH and self._better(inherited, self._best[next_state]):
+                    self._best[next_state] = inherited
+
+    def to_arrays(self) -> Dict[str, List[int]]:
+        """
+        Flat int form of the automaton (see MappedKeywordMatcher):
+        edges of state s are edge_char/edge_target[edge_start[s]:edge_start[s + 1]], sorted by code point.
+        """
+        edge_start, edge_char, edge_target = [], [], []
+        for transitions in self._goto:
+            edge_start.append(len(edge_char))
+            for char, next_state in sorted(transitions.items()):
+                edge_char.append(ord(char))
+                edge_target.append(next_state)
+        edge_start.append(len(edge_char))
+
+        return {
+            "edge_start": edge_start,
+            "edge_char": edge_char,
+            "edge_target": edge_target,
+            "fail": list(self._fail),
+            "best": list(self._best),
+            "priorities": list(self.priorities)
+        }
+
+    def match(self, text: str) -> Optional[Tuple[str, int]]:
+        """Best-priority (keyword, priority) contained in text, or None"""
+        goto, fail, best = self._goto, self._fail, self._best
+        found = self.NO_MATCH
+        state = 0
+
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            candidate = best[state]
+            if candidate != self.NO_MATCH and self._better(candidate, found):
+                found = candidate
+                if self.priorities[found] == self._top_priority:
+                    break  # nothing can beat it
+
+        if found == self.NO_MATCH:
+            return None
+        return self.keywords[found], self.priorities[found]
+
+
+class MappedKeywordMatcher:
+    """
+    Read-only KeywordMatcher over flat int arrays (e.g. slices of a memory-mapped file).
+    Same match() result as the KeywordMatcher the arrays were exported from.
+    """
+
+    NO_MATCH = KeywordMatcher.NO_MATCH
+
+    def __init__(self, keywords: List[str], arrays: Dict[str, Sequence[int]]):
+        self.keywords = keywords
+        self._edge_start = arrays["edge_start"]
+        self._edge_char = arrays["edge_char"]
+        self._edge_target = arrays["edge_target"]
+        self._fail = arrays["fail"]
+        self._best = arrays["best"]
+        self.priorities = arrays["priorities"]
+        self._top_priority = min(self.priorities, default=0)
+
+        # Most characters restart at the root - keep its few edges in a dict
+        self._root = {
+            self._edge_char[i]: self._edge_target[i]
+            for i in range(self._edge_start[0], self._edge_start[1])
+        }
+
+    def match(self, text: str) -> Optional[Tuple[str, int]]:
+        """Best-priority (keyword, priority) contained in text, or None"""
+        edge_start, edge_char, edge_target = self._edge_start, self._edge_char, self._edge_target
+        fail, best, priorities, root = self._fail, self._best, self.priorities, self._root
+        found = self.NO_MATCH
+        state = 0
+
+        for char in text.lower():
+            code = ord(char)
+            while True:
+                if state == 0:
+                    state = root.get(code, 0)
+                    break
+                lo, hi = edge_start[state], edge_start[state + 1]
+                i = bisect_left(edge_char, code, lo, hi)
+                if i < hi and edge_char[i] == code:
+                    state = edge_target[i]
+                    break
+                state = fail[state]
+
+            candidate = best[state]
+            if candidate != self.NO_MATCH and (found == self.NO_MATCH or priorities[candidate] < priorities[found]):
+                found = candidate
+                if priorities[found] == self._top_priority:
+                    break  # nothing can beat it
+
+        if found == self.NO_MATCH:
+            return None
+        return self.keywords[found], priorities[found]
@@ -5,12 +5,13 @@ from typing import List, Dict, Any, Optional
 import uuid
 from datetime import datetime
 
-from app.db.neon_connection import SessionLocal, Category, Keyword, Rule, Menu
+from app.db.neon_connection import engine, SessionLocal, Category, Keyword, Rule, Menu, RuleVersion
 
 class NeonService:
     
     def __init__(self):
         """Initialize Neon service"""
+        self._rule_version_ready = False
         print("✅ NeonService initialized")
     
     # ========== CATEGORIES ==========
@@ -75,6 +76,7 @@ class NeonService:
             )
             
             db.add(category)
+            self._bump_rules_version(db)
             db.commit()
             
             return {
@@ -137,6 +139,7 @@ class NeonService:
             )
             
             db.add(keyword)
+            self._bump_rules_version(db)
             db.commit()
             
             return {
@@ -230,6 +233,7 @@ class NeonService:
                 if cat:
                     rule.recommended_categories.append(db.query(Category).get(cat_id))
             
+            self._bump_rules_version(db)
             db.commit()
             
             return {
@@ -247,6 +251,62 @@ class NeonService:
         finally:
             db.close()
     
+    # ========== RULE SNAPSHOT ==========
+    def _ensure_rule_version_table(self):
+        if not self._rule_version_ready:
+            RuleVersion.__table__.create(bind=engine, checkfirst=True)
+            self._rule_version_ready = True
+    
+    def _bump_rules_version(self, db: Session):
+        """Signal every worker to rebuild its rule snapshot (part of the caller's transaction)"""
+        self._ensure_rule_version_table()
+        updated = db.query(RuleVersion).filter(RuleVersion.id == 1).update({
+            RuleVersion.version: RuleVersion.version + 1,
+            RuleVersion.updated_at: datetime.utcnow()
+        })
+        if not updated:
+            db.add(RuleVersion(id=1, version=1))
+    
+    def get_rules_version(self) -> int:
+        """Current rule set version - errors propagate to the caller"""
+        self._ensure_rule_version_table()
+        db = SessionLocal()
+        try:
+            row = db.get(RuleVersion, 1)
+            return row.version if row else 0
+        finally:
+            db.close()
+    
+    def get_rule_tables(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Categories (in priority order), keywords and rules for the rule snapshot"""
+        db = SessionLocal()
+        try:
+            categories = db.query(Category).order_by(Category.created_at, Category.id).all()
+            # Stable order - the snapshot file is keyed on a hash of these tables
+            keywords = db.query(Keyword).order_by(Keyword.id).all()
+            rules = db.query(Rule).order_by(Rule.id).all()
+            
+            return {
+                "categories": [
+                    {"id": c.id, "name": c.name, "is_unhealthy": c.is_unhealthy}
+                    for c in categories
+                ],
+                "keywords": [
+                    {"keyword": k.keyword, "category_id": k.category_id, "match_type": k.match_type}
+                    for k in keywords
+                ],
+                "rules": [
+                    {
+                        "trigger_category_id": r.trigger_category_id,
+                        "ai_prompt_template": r.ai_prompt_template,
+                        "recommended_category_names": [c.name for c in r.recommended_categories]
+                    }
+                    for r in rules
+                ]
+            }
+        finally:
+            db.close()
+    
     # ========== HEALTH CHECK ==========
     def health_check(self) -> Dict[str, Any]:
         """Check database health"""
@@ -0,0 +1,174 @@
+# app/services/place_pool.py
+from typing import Iterable, List, Optional
+import asyncio
+import logging
+
+from app.config import settings
+from app.models.place_model import Place
+from app.utils import geo
+
+logger = logging.getLogger(__name__)
+
+# Every type any stage of the recommend pipeline searches for
+POOL_PLACE_TYPES = ['restaurant', 'cafe', 'gym', 'food', 'bar', 'meal_takeaway']
+
+HEALTHY_PLACE_TYPES = ['cafe', 'gym', 'food']
+
+
+class PlacePool:
+    """
+    Places fetched once per request.
+
+    The superset of types is searched a single time; alternatives and AI
+    context are then selected with in-memory filters over the pool.
+    """
+
+    def __init__(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_types: Optional[List[str]] = None
+    ):
+        self.lat = lat
+        self.lng = lng
+        self.radius = radius
+        self.place_types = place_types or POOL_PLACE_TYPES
+        self.places: List[Place] = []
+
+    async def load(self, shared_tiles: bool = False) -> List[Place]:
+        """
+        Fetch the superset of place types once.
+
+        shared_tiles always answers from the per-type places cache tiles at the
+        pool's own radius bucket, skipping the adaptive search and paging, whose
+        searches are centered on this point - for batches of nearby pools.
+        """
+        from app.services.google_service import google_service
+
+        if shared_tiles:
+            self.places = await google_service.get_nearby_places_by_types_async(
+                lat=self.lat,
+                lng=self.lng,
+                radius=self.radius,
+                place_types=self.place_types
+            )
+        elif self.radius >= settings.PLACES_PAGINATE_MIN_RADIUS:
+            # One page of 20 per type drops most candidates at large radii
+            self.places = await self._load_paginated(settings.PLACE_POOL_TARGET_CANDIDATES)
+        elif settings.PLACES_ADAPTIVE_SEARCH:
+            # Dense areas rarely need the full radius
+            self.places, _ = await google_service.get_nearby_places_by_types_adaptive(
+                lat=self.lat,
+                lng=self.lng,
+                radius=self.radius,
+                place_types=self.place_types,
+                min_results=settings.PLACES_ADAPTIVE_TARGET_CANDIDATES,
+                accept=self._is_candidate
+            )
+        else:
+            self.places = await google_service.get_nearby_places_by_types_async(
+                lat=self.lat,
+                lng=self.lng,
+                radius=self.radius,
+                place_types=self.place_types
+            )
+
+        if not self.places:
+            self.places = await self.load_from_store()
+
+        logger.info(f"🗂️ Place pool loaded: {len(self.places)} places")
+        return self.places
+
+    async def load_from_store(self) -> List[Place]:
+        """Last resort when upstream returned nothing (or too late) - serve stored places"""
+        from app.services.place_store import place_store
+
+        if place_store is None:
+            return []
+
+        try:
+            places = await asyncio.to_thread(
+                place_store.query_nearby, self.lat, self.lng, self.radius, self.place_types
+            )
+        except Exception as e:
+            logger.error(f"Place store lookup failed: {e}")
+            return []
+
+        from app.services.healthy_index import healthy_index
+
+        if healthy_index is not None:
+            healthy_index.add(places)
+        return places
+
+    async def _load_paginated(self, target_candidates: int) -> List[Place]:
+        """
+        Page through results until enough classified candidates are found.
+        Every type's first page is always kept, so no type drops out of the pool;
+        only follow-up pages are skipped.
+        """
+        from app.services.google_service import google_service
+        from app.services.rule_engine import rule_engine
+
+        places = []
+        candidates = 0
+
+        pages = google_service.stream_nearby_places_by_types(
+            lat=self.lat,
+            lng=self.lng,
+            radius=self.radius,
+            place_types=self.place_types
+        )
+        async for new_places, first_pages_done in pages:
+            places.extend(new_places)
+            candidates += len(rule_engine.analyze_places(new_places).triggered_indices)
+            if first_pages_done and candidates >= target_candidates:
+                logger.info(f"🗂️ {candidates} candidates found - skipping remaining pages")
+                break
+        await pages.aclose()
+
+        return places
+
+    @staticmethod
+    def _is_candidate(place: Place) -> bool:
+        """Whether the rule engine classifies a place"""
+        from app.services.rule_engine import rule_engine
+
+        return rule_engine.classify_place(place) is not None
+
+    def of_types(
+        self,
+        place_types: Iterable[str],
+        limit_per_type: Optional[int] = None
+    ) -> List[Place]:
+        """Places having any of the given types, in pool order"""
+        results = []
+        seen_ids = set()
+
+        for place_type in place_types:
+            matches = [p for p in self.places if place_type in p.types]
+            for place in matches[:limit_per_type]:
+                if place.place_id not in seen_ids:
+                    seen_ids.add(place.place_id)
+                    results.append(place)
+
+        return results
+
+    def near(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_types: Optional[Iterable[str]] = None
+    ) -> List[Place]:
+        """Places within radius of a point, optionally restricted to types"""
+        candidates = self.of_types(place_types) if place_types else self.places
+        inside = geo.haversine_many(lat, lng, *geo.coordinates(candidates)) <= radius
+        return [place for place, keep in zip(candidates, inside) if keep]
+
+    def healthy_alternatives(self, limit: int = 10) -> List[Place]:
+        """Same selection as GoogleMapsService.get_healthy_alternatives_nearby_async, from the pool"""
+        from app.services.google_service import GoogleMapsService
+
+        candidates = self.of_types(HEALTHY_PLACE_TYPES, limit_per_type=5)
+        return GoogleMapsService.filter_healthy_places(candidates)[:limit]
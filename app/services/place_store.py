@@ -0,0 +1,376 @@
+# app/services/place_store.py
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.models.place_model import Place
+from app.utils import geo
+
+logger = logging.getLogger(__name__)
+
+# (geohash cell, place type, radius bucket) - same key as PlacesCache tiles
+TileKey = Tuple[str, str, int]
+
+
+class PlaceStore(ABC):
+    """
+    Persistent store for enriched places, indexed by location.
+    Places are stored in their to_dict() JSON form.
+
+    Tiles record which places one (cell, type, bucket) search returned and
+    when, so nearby lookups can be served from the store while it is fresh
+    and re-pulled in the background as it ages. All methods are blocking;
+    async callers run them in a worker thread.
+    """
+
+    @abstractmethod
+    def get_tile(self, key: TileKey) -> Optional[Tuple[List[Place], float]]:
+        """Return (places, fetched_at epoch seconds) for a tile"""
+
+    @abstractmethod
+    def put_tile(self, key: TileKey, places: List[Place]):
+        """Store the places one tile search returned"""
+
+    @abstractmethod
+    def query_nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_types: Optional[Iterable[str]] = None
+    ) -> List[Place]:
+        """Stored places within radius, nearest first"""
+
+    @abstractmethod
+    def aging_tiles(self, older_than: float, active_since: float, limit: int) -> List[TileKey]:
+        """Recently used tiles fetched before older_than (epoch seconds)"""
+
+    @staticmethod
+    def _filter_nearby(
+        lat: float,
+        lng: float,
+        radius: int,
+        places: Iterable[Place],
+        place_types: Optional[Iterable[str]]
+    ) -> List[Place]:
+        wanted = set(place_types) if place_types else None
+        if wanted:
+            places = [place for place in places if not wanted.isdisjoint(place.types)]
+        else:
+            places = list(places)
+
+        distances = geo.haversine_many(lat, lng, *geo.coordinates(places))
+        # Stable sort keeps the store's order for equal distances
+        order = np.argsort(distances, kind="stable")
+        return [places[i] for i in order if distances[i] <= radius]
+
+
+class SQLitePlaceStore(PlaceStore):
+    """Local store - places indexed with an SQLite R*Tree"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS places (
+                    id INTEGER PRIMARY KEY,
+                    place_id TEXT UNIQUE NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree USING rtree(
+                    id, min_lat, max_lat, min_lng, max_lng
+                );
+                CREATE TABLE IF NOT EXISTS place_tiles (
+                    cell TEXT NOT NULL,
+                    place_type TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    place_ids TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    PRIMARY KEY (cell, place_type, bucket)
+                );
+            """)
+            self._conn = conn
+            logger.info(f"✅ SQLite place store opened: {self.path}")
+        return self._conn
+
+    def get_tile(self, key: TileKey) -> Optional[Tuple[List[Place], float]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT place_ids, fetched_at FROM place_tiles WHERE cell = ? AND place_type = ? AND bucket = ?",
+                key
+            ).fetchone()
+            if row is None:
+                return None
+
+            place_ids = json.loads(row[0])
+            conn.execute(
+                "UPDATE place_tiles SET last_accessed = ? WHERE cell = ? AND place_type = ? AND bucket = ?",
+                (time.time(), *key)
+            )
+            conn.commit()
+
+            places = self._load_places(conn, place_ids)
+            return places, row[1]
+
+    def _load_places(self, conn: sqlite3.Connection, place_ids: List[str]) -> List[Place]:
+        if not place_ids:
+            return []
+
+        placeholders = ','.join('?' * len(place_ids))
+        rows = conn.execute(
+            f"SELECT place_id, data FROM places WHERE place_id IN ({placeholders})",
+            place_ids
+        ).fetchall()
+        by_id = {place_id: Place.from_dict(json.loads(data)) for place_id, data in rows}
+        return [by_id[place_id] for place_id in place_ids if place_id in by_id]
+
+    def put_tile(self, key: TileKey, places: List[Place]):
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            for place in places:
+                lat, lng = place.location
+                if not place.place_id or lat is None or lng is None:
+                    continue
+
+                conn.execute(
+                    """
+                    INSERT INTO places (place_id, data, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(place_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+                    """,
+                    (place.place_id, json.dumps(place.to_dict()), now)
+                )
+                row_id = conn.execute(
+                    "SELECT id FROM places WHERE place_id = ?", (place.place_id,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO places_rtree VALUES (?, ?, ?, ?, ?)",
+                    (row_id, lat, lat, lng, lng)
+                )
+
+            conn.execute(
+                """
+                INSERT INTO place_tiles (cell, place_type, bucket, place_ids, fetched_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cell, place_type, bucket) DO UPDATE SET
+                    place_ids = excluded.place_ids, fetched_at = excluded.fetched_at
+                """,
+                (*key, json.dumps([p.place_id for p in places if p.place_id]), now, now)
+            )
+            conn.commit()
+
+    def query_nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_types: Optional[Iterable[str]] = None
+    ) -> List[Place]:
+        lat_min, lat_max, lng_min, lng_max = geo.bounding_box(lat, lng, radius)
+
+        with self._lock:
+            rows = self._connect().execute(
+                """
+                SELECT p.data FROM places_rtree r JOIN places p ON p.id = r.id
+                WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lng >= ? AND r.max_lng <= ?
+                """,
+                (lat_min, lat_max, lng_min, lng_max)
+            ).fetchall()
+
+        return self._filter_nearby(lat, lng, radius, (Place.from_dict(json.loads(row[0])) for row in rows), place_types)
+
+    def aging_tiles(self, older_than: float, active_since: float, limit: int) -> List[TileKey]:
+        with self._lock:
+            rows = self._connect().execute(
+                """
+                SELECT cell, place_type, bucket FROM place_tiles
+                WHERE fetched_at < ? AND last_accessed >= ?
+                ORDER BY last_accessed DESC LIMIT ?
+                """,
+                (older_than, active_since, limit)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+
+class PostgresPlaceStore(PlaceStore):
+    """Production store - places in Postgres with a (lat, lng) index"""
+
+    def __init__(self):
+        from app.db.neon_connection import engine, PlaceTile, StoredPlace
+
+        StoredPlace.__table__.create(bind=engine, checkfirst=True)
+        PlaceTile.__table__.create(bind=engine, checkfirst=True)
+        logger.info("✅ Postgres place store ready")
+
+    def get_tile(self, key: TileKey) -> Optional[Tuple[List[Place], float]]:
+        from app.db.neon_connection import SessionLocal, PlaceTile, StoredPlace
+
+        db = SessionLocal()
+        try:
+            tile = db.get(PlaceTile, key)
+            if tile is None:
+                return None
+
+            tile.last_accessed = time.time()
+            db.commit()
+
+            place_ids = list(tile.place_ids or [])
+            rows = db.query(StoredPlace).filter(StoredPlace.place_id.in_(place_ids)).all() if place_ids else []
+            by_id = {row.place_id: Place.from_dict(row.data) for row in rows}
+            return [by_id[pid] for pid in place_ids if pid in by_id], tile.fetched_at
+        finally:
+            db.close()
+
+    def put_tile(self, key: TileKey, places: List[Place]):
+        from app.db.neon_connection import SessionLocal, PlaceTile, StoredPlace
+
+        now = time.time()
+        db = SessionLocal()
+        try:
+            for place in places:
+                if not place.place_id or place.lat is None or place.lng is None:
+                    continue
+                db.merge(StoredPlace(
+                    place_id=place.place_id,
+                    lat=place.lat,
+                    lng=place.lng,
+                    data=place.to_dict(),
+                    updated_at=now
+                ))
+
+            cell, place_type, bucket = key
+            db.merge(PlaceTile(
+                cell=cell,
+                place_type=place_type,
+                bucket=bucket,
+                place_ids=[p.place_id for p in places if p.place_id],
+                fetched_at=now,
+                last_accessed=now
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def query_nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_types: Optional[Iterable[str]] = None
+    ) -> List[Place]:
+        from app.db.neon_connection import SessionLocal, StoredPlace
+
+        lat_min, lat_max, lng_min, lng_max = geo.bounding_box(lat, lng, radius)
+        db = SessionLocal()
+        try:
+            rows = db.query(StoredPlace.data).filter(
+                StoredPlace.lat.between(lat_min, lat_max),
+                StoredPlace.lng.between(lng_min, lng_max)
+            ).all()
+        finally:
+            db.close()
+
+        return self._filter_nearby(lat, lng, radius, (Place.from_dict(row[0]) for row in rows), place_types)
+
+    def aging_tiles(self, older_than: float, active_since: float, limit: int) -> List[TileKey]:
+        from app.db.neon_connection import SessionLocal, PlaceTile
+
+        db = SessionLocal()
+        try:
+            rows = db.query(PlaceTile.cell, PlaceTile.place_type, PlaceTile.bucket).filter(
+                PlaceTile.fetched_at < older_than,
+                PlaceTile.last_accessed >= active_since
+            ).order_by(PlaceTile.last_accessed.desc()).limit(limit).all()
+            return [tuple(row) for row in rows]
+        finally:
+            db.close()
+
+
+def create_place_store() -> Optional[PlaceStore]:
+    """Build the configured place store backend (None when disabled)"""
+    backend = settings.PLACE_STORE_BACKEND.lower()
+
+    try:
+        if backend == "sqlite":
+            return SQLitePlaceStore(settings.PLACE_STORE_SQLITE_PATH)
+        if backend == "postgres":
+            return PostgresPlaceStore()
+    except Exception as e:
+        logger.error(f"Place store '{backend}' unavailable: {e}")
+
+    return None
+
+
+class PlaceStoreRefresher:
+    """Background task re-pulling aging tiles so the store stays fresh"""
+
+    def __init__(self, store: PlaceStore):
+        self.store = store
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("🔄 Place store refresher started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.PLACE_STORE_REFRESH_INTERVAL)
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                logger.error(f"Place store refresh failed: {e}")
+
+    async def refresh_once(self) -> int:
+        """Re-pull one batch of aging tiles"""
+        from app.services.google_service import google_service
+        from app.services.places_cache import places_cache
+
+        now = time.time()
+        keys = await asyncio.to_thread(
+            self.store.aging_tiles,
+            now - settings.PLACE_STORE_FRESH_TTL * 0.8,
+            now - settings.PLACE_STORE_ACTIVE_WINDOW,
+            settings.PLACE_STORE_REFRESH_BATCH
+        )
+
+        for key in keys:
+            await places_cache.refresh_tile(key, google_service.fetch_tile)
+
+        if keys:
+            logger.info(f"🔄 Refreshed {len(keys)} aging place tiles")
+        return len(keys)
+
+# Singleton instances
+place_store = create_place_store()
+place_store_refresher = PlaceStoreRefresher(place_store) if place_store else None
@@ -0,0 +1,256 @@
+# app/services/places_cache.py
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import math
+import time
+
+from app.config import settings
+from app.models.place_model import Place
+from app.utils import deadline, geo
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Follow-up pages of a tile whose first page came back full
+MorePages = Callable[[], Awaitable[List[Place]]]
+
+# Loader signature: (lat, lng, radius, place_type) -> (first page of enriched places, follow-up pages or None)
+TileLoader = Callable[[float, float, int, str], Awaitable[Tuple[List[Place], Optional[MorePages]]]]
+
+TileKey = Tuple[str, str, int]
+
+RADIUS_BUCKETS = (250, 500, 1000, 1500, 2000, 5000, 10000, 25000, 50000)
+
+
+@dataclass
+class _TileEntry:
+    places: List[Place]
+    fetched_at: float
+
+
+class PlacesCache:
+    """
+    Geohash-tiled TTL cache for nearby Places results.
+
+    Each tile holds the results of one place type for one geohash cell, fetched
+    at the cell center with a radius that reaches the radius bucket from anywhere
+    in the cell. A query is answered from the single tile containing its center,
+    then filtered by exact distance - one upstream search per type when cold.
+    A tile whose first page is full is served right away and completed with its
+    follow-up pages in the background.
+    """
+
+    def __init__(self):
+        self.ttl = settings.PLACES_CACHE_TTL
+        self.stale_ttl = settings.PLACES_CACHE_STALE_TTL
+        self.negative_ttl = settings.PLACES_CACHE_NEGATIVE_TTL
+        self.max_entries = settings.PLACES_CACHE_MAX_ENTRIES
+        self.tile_slack = settings.PLACES_CACHE_TILE_SLACK
+
+        self._entries: "OrderedDict[TileKey, _TileEntry]" = OrderedDict()
+        self._refreshing: Set[TileKey] = set()
+        self.in_flight = SingleFlight()  # one load per tile, however many requests miss it
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {
+            "hits": 0, "stale_hits": 0, "negative_hits": 0, "misses": 0,
+            "refreshes": 0, "background_pages": 0, "store_hits": 0, "store_fallbacks": 0
+        }
+        logger.info("✅ PlacesCache initialized")
+
+    # ========== PUBLIC API ==========
+
+    async def get_nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        place_type: str,
+        loader: TileLoader
+    ) -> List[Place]:
+        """Answer a nearby search from the tile containing its center"""
+        bucket = self.radius_bucket(radius)
+        cell = geo.geohash_encode(lat, lng, self.tile_precision(bucket, lat))
+
+        # The tile is shared, so it loads outside this request's budget. Shielded so a request
+        # that stops waiting still lets the load land in the cache.
+        tile = asyncio.create_task(self._get_tile((cell, place_type, bucket), loader), context=deadline.detached())
+        places = await asyncio.shield(tile)
+
+        # Keep only places inside the requested circle
+        inside = geo.haversine_many(lat, lng, *geo.coordinates(places)) <= radius
+        return [place for place, keep in zip(places, inside) if keep]
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters"""
+        return {**self._stats, "entries": len(self._entries)}
+
+    def clear(self):
+        self._entries.clear()
+
+    # ========== TILING ==========
+
+    @staticmethod
+    def radius_bucket(radius: int) -> int:
+        """Round a radius up to the next bucket"""
+        for bucket in RADIUS_BUCKETS:
+            if radius <= bucket:
+                return bucket
+        return RADIUS_BUCKETS[-1]
+
+    def tile_precision(self, bucket: int, lat: float) -> int:
+        """
+        Coarsest geohash precision whose cells reach at most tile_slack * bucket
+        from their center - bounds how much wider a tile search is than the query.
+        """
+        for precision in range(2, 9):
+            height, width = geo.geohash_cell_meters(precision, lat)
+            if math.hypot(height, width) / 2 <= bucket * self.tile_slack:
+                return precision
+        return 9
+
+    @staticmethod
+    def tile_query(cell: str, bucket: int) -> Tuple[float, float, int]:
+        """Center and radius of the upstream search covering any query of the bucket centered in a cell"""
+        lat, lng = geo.geohash_center(cell)
+        lat_min, lat_max, lng_min, lng_max = geo.geohash_bounds(cell)
+        radius = bucket + geo.haversine_m(lat, lng, lat_max, lng_max) + 1
+        return lat, lng, min(radius, 50000)
+
+    # ========== TILES ==========
+
+    async def _get_tile(self, key: TileKey, loader: TileLoader) -> List[Place]:
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            ttl = self.ttl if entry.places else self.negative_ttl
+
+            if age < ttl:
+                self._stats["hits" if entry.places else "negative_hits"] += 1
+                self._entries.move_to_end(key)
+                return entry.places
+
+            if age < ttl + self.stale_ttl:
+                # Serve stale data now, refresh in the background
+                self._stats["stale_hits"] += 1
+                self._schedule_refresh(key, loader)
+                return entry.places
+
+        self._stats["misses"] += 1
+        try:
+            return await self.in_flight.do(key, lambda: self._load(key, loader))
+        except Exception as e:
+            logger.error(f"Places tile {key} failed to load: {e}")
+            return entry.places if entry is not None else []
+
+    async def refresh_tile(self, key: TileKey, loader: TileLoader):
+        """Re-pull a tile from upstream, bypassing the place store"""
+        try:
+            await self._load(key, loader, force=True, background=True)
+        except Exception as e:
+            logger.warning(f"Refresh of tile {key} failed: {e}")
+
+    async def _load(
+        self,
+        key: TileKey,
+        loader: TileLoader,
+        force: bool = False,
+        background: bool = False
+    ) -> List[Place]:
+        """
+        Fill a tile. On the request path (background=False) a full first page is
+        stored and returned at once, and the follow-up pages complete it later.
+        """
+        from app.services.place_store import place_store
+
+        stored = None
+        if place_store is not None:
+            try:
+                stored = await asyncio.to_thread(place_store.get_tile, key)
+            except Exception as e:
+                logger.error(f"Place store read failed for {key}: {e}")
+
+        if stored is not None and not force:
+            places, fetched_at = stored
+            if time.time() - fetched_at < settings.PLACE_STORE_FRESH_TTL:
+                self._stats["store_hits"] += 1
+                self._store(key, places)
+                return places
+
+        cell, place_type, bucket = key
+        lat, lng, radius = self.tile_query(cell, bucket)
+
+        try:
+            places, more_pages = await loader(lat, lng, radius, place_type)
+        except Exception:
+            if stored is None:
+                raise
+            # Upstream outage or quota exhaustion - keep serving what we have
+            logger.warning(f"Serving stored tile {key} after upstream failure")
+            self._stats["store_fallbacks"] += 1
+            self._store(key, stored[0])
+            return stored[0]
+
+        if more_pages is None:
+            self._complete(key, places)
+        elif background:
+            self._complete(key, places + await more_pages())
+        else:
+            # Partial tiles are cached but never persisted
+            self._store(key, places)
+            self._spawn(self._load_more(key, places, more_pages))
+        return places
+
+    async def _load_more(self, key: TileKey, first_page: List[Place], more_pages: MorePages):
+        self._stats["background_pages"] += 1
+        self._complete(key, first_page + await more_pages())
+
+    def _complete(self, key: TileKey, places: List[Place]):
+        from app.services.place_store import place_store
+
+        self._store(key, places)
+        if place_store is not None:
+            self._spawn(self._persist(place_store, key, places))
+
+    @staticmethod
+    async def _persist(store, key: TileKey, places: List[Place]):
+        try:
+            await asyncio.to_thread(store.put_tile, key, places)
+        except Exception as e:
+            logger.error(f"Place store write failed for {key}: {e}")
+
+    def _store(self, key: TileKey, places: List[Place]):
+        self._entries[key] = _TileEntry(places=places, fetched_at=time.monotonic())
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule_refresh(self, key: TileKey, loader: TileLoader):
+        if key in self._refreshing:
+            return
+
+        self._refreshing.add(key)
+        self._spawn(self._refresh(key, loader))
+
+    def _spawn(self, coro):
+        # Refreshes and follow-up pages must not inherit the budget of the request that triggered them
+        task = asyncio.create_task(coro, context=deadline.detached())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: TileKey, loader: TileLoader):
+        try:
+            self._stats["refreshes"] += 1
+            # Straight to upstream - the place store would hand back the same aging data
+            await self._load(key, loader, force=True, background=True)
+        except Exception as e:
+            logger.warning(f"Background refresh of tile {key} failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+# Singleton instance
+places_cache = PlacesCache()
@@ -0,0 +1,126 @@
+# app/services/quota_governor.py
+from typing import Dict, Optional
+import asyncio
+import logging
+import threading
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaExhausted(Exception):
+    """No quota token became available before the caller's deadline"""
+
+
+class TokenBucket:
+    """
+    Token bucket with adaptive rate.
+
+    OVER_QUERY_LIMIT responses cut the rate multiplicatively and pause the
+    bucket; each success grows the rate back towards its configured value.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token - returns 0 on success, else seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def penalize(self):
+        with self._lock:
+            self.rate = max(self.base_rate * settings.PLACES_QUOTA_MIN_RATE_RATIO, self.rate * 0.5)
+            self.tokens = 0
+            self.paused_until = time.monotonic() + settings.PLACES_QUOTA_BACKOFF_SECONDS
+
+    def reward(self):
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+
+class QuotaGovernor:
+    """
+    Process-wide token buckets for upstream API calls, one per API key.
+
+    Configured rates are per deployment and are divided across
+    PLACES_QUOTA_WORKERS processes.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "waited": 0, "rejected": 0, "over_limit": 0}
+        logger.info("✅ QuotaGovernor initialized")
+
+    def bucket(self, api_key: str) -> TokenBucket:
+        with self._lock:
+            if api_key not in self._buckets:
+                rate = self._configured_rate(api_key) / max(settings.PLACES_QUOTA_WORKERS, 1)
+                self._buckets[api_key] = TokenBucket(rate, max(rate * settings.PLACES_QUOTA_BURST_SECONDS, 1))
+            return self._buckets[api_key]
+
+    @staticmethod
+    def _configured_rate(api_key: str) -> float:
+        # PLACES_QPS_BY_KEY looks like "key1:20,key2:5"
+        for item in settings.PLACES_QPS_BY_KEY.split(','):
+            key, _, qps = item.strip().rpartition(':')
+            if key and key == api_key:
+                return float(qps)
+        return settings.PLACES_QPS
+
+    async def acquire(self, api_key: str, timeout: Optional[float] = None):
+        """Wait for a token, raising QuotaExhausted if none arrives within timeout"""
+        bucket = self.bucket(api_key)
+        timeout = settings.PLACES_QUOTA_WAIT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+
+        while True:
+            wait = bucket.try_acquire()
+            if wait == 0:
+                self._stats["acquired"] += 1
+                if waited:
+                    self._stats["waited"] += 1
+                return
+            if time.monotonic() + wait > deadline:
+                self._stats["rejected"] += 1
+                raise QuotaExhausted(f"No Places quota available within {timeout}s")
+            waited = True
+            await asyncio.sleep(wait)
+
+    def report_over_limit(self, api_key: str):
+        logger.warning("⏳ OVER_QUERY_LIMIT - backing off Places rate")
+        self._stats["over_limit"] += 1
+        self.bucket(api_key).penalize()
+
+    def report_success(self, api_key: str):
+        self.bucket(api_key).reward()
+
+    def stats(self):
+        return {
+            **self._stats,
+            "rates": {f"...{key[-4:]}": round(b.rate, 2) for key, b in self._buckets.items()}
+        }
+
+# Singleton instance
+quota_governor = QuotaGovernor()
@@ -1,8 +1,13 @@
 
 # app/services/recommend_service.py
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+import asyncio
 import logging
-import math
+
+from app.config import settings
+from app.models.place_model import Place
+from app.services.place_pool import PlacePool
+from app.utils import deadline, geo
 
 logger = logging.getLogger(__name__)
 
@@ -18,120 +23,172 @@ class RecommendationService:
         radius: int = 500,
         user_context: str = "",
         include_specific_locations: bool = False,
-        include_menu: bool = False
+        include_menu: bool = False,
+        top_k: Optional[int] = None,
+        shared_tiles: bool = False
     ) -> Dict[str, Any]:
         """
-        Main recommendation pipeline
+        Main recommendation pipeline.
+        
+        Upstream-bound stages run under their own deadline; a stage that
+        overruns degrades (stored places, no alternatives, template message)
+        and is listed in the response's timed_out_stages.
+        shared_tiles answers from the cached per-type tiles (see PlacePool.load).
+        """
+        response = None
+        async for event, payload in self.stream_recommendation(
+            lat, lng, radius, user_context, include_specific_locations, include_menu, top_k, shared_tiles
+        ):
+            if event == "result":
+                response = payload
+        return response
+    
+    async def stream_recommendation(
+        self, 
+        lat: float, 
+        lng: float, 
+        radius: int = 500,
+        user_context: str = "",
+        include_specific_locations: bool = False,
+        include_menu: bool = False,
+        top_k: Optional[int] = None,
+        shared_tiles: bool = False
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        The recommendation pipeline as (event, payload) pairs, each sent as soon as it is known:
+        
+            detected      - target place, category and ranked targets (after one Places round trip)
+            alternatives  - healthy alternatives
+            ai_message    - the AI message
+            result        - the full analyze_and_recommend response, always last
+        
+        Early exits (no places, all healthy, errors) only send result.
         """
         try:
             # Import here to avoid circular imports
-            from app.services.google_service import google_service
             from app.services.rule_engine import rule_engine
             from app.services.ai_service import ai_service
+            from app.services.target_ranker import target_ranker
             
             logger.info(f"📍 Searching restaurants/cafes/gyms near: ({lat}, {lng}), radius: {radius}m")
+            timed_out = []
             
-            # 1. Search ONLY for restaurants, cafes, gyms
-            target_place_types = ['restaurant', 'cafe', 'gym', 'food', 'bar', 'meal_takeaway']
-            
-            nearby_places = google_service.get_nearby_places_by_types(
-                lat=lat,
-                lng=lng,
-                radius=radius,
-                place_types=target_place_types
+            # 1. Search ONLY for restaurants, cafes, gyms - once for the whole request
+            pool = PlacePool(lat, lng, radius)
+            nearby_places = await self._run_stage(
+                "places", settings.PIPELINE_PLACES_TIMEOUT, pool.load(shared_tiles), timed_out, fallback=None
             )
+            if nearby_places is None:
+                nearby_places = pool.places = await pool.load_from_store()
             
             if not nearby_places:
-                return {
+                response = {
                     "status": "no_food_places",
                     "message": "No restaurants, cafes, or gyms found in this area",
                     "total_places_found": 0
                 }
+                if timed_out:
+                    response["partial"] = True
+                    response["timed_out_stages"] = timed_out
+                yield "result", response
+                return
             
             logger.info(f"🍽️ Found {len(nearby_places)} restaurants/cafes/gyms")
             
-            # 2. Analyze places (only restaurants/cafes/gyms)
-            unhealthy_places = []
-            all_analyzed_places = []
+            # 2. Analyze places (only restaurants/cafes/gyms) in one batch
+            batch = rule_engine.analyze_places(nearby_places)
             
-            for place in nearby_places:
-                place_name = place.get('name', '')
-                place_types = place.get('types', [])
-                
-                result = rule_engine.analyze_place(place_name, place_types)
-                
-                if result['triggered']:
-                    place['analysis'] = result
-                    all_analyzed_places.append(place)
-                    
-                    if result.get('is_unhealthy', False):
-                        unhealthy_places.append(place)
+            logger.info(f"🚨 Unhealthy places: {len(batch.unhealthy_indices)}, 🥗 All analyzed: {len(batch.triggered_indices)}")
             
-            logger.info(f"🚨 Unhealthy places: {len(unhealthy_places)}, 🥗 All analyzed: {len(all_analyzed_places)}")
-            
-            # 3. Select target
-            target_place = None
-            target_result = None
+            # 3. Select target - best scored unhealthy place, else best scored analyzed place
+            candidates = batch.unhealthy_indices or batch.triggered_indices
+            ranked = target_ranker.top_k(
+                nearby_places,
+                batch.category_ids,
+                batch.unhealthy,
+                candidates,
+                lat, lng, radius,
+                k=max(top_k or settings.TARGET_TOP_K, 1)
+            )
             
-            if unhealthy_places:
-                # Use first unhealthy place
-                target_place = unhealthy_places[0]
-                target_result = target_place['analysis']
-                logger.info(f"🚨 Targeting unhealthy: {target_place.get('name')}")
-            elif all_analyzed_places:
-                # Use first analyzed place
-                target_place = all_analyzed_places[0]
-                target_result = target_place['analysis']
-                logger.info(f"📍 Targeting: {target_place.get('name')}")
+            if ranked:
+                target_index = ranked[0][0]
+                target_place = nearby_places[target_index]
+                target_result = target_place.analysis = batch.result(target_index)
+                logger.info(f"{'🚨' if target_result['is_unhealthy'] else '📍'} Targeting: {target_place.name} (score {ranked[0][1]})")
             else:
                 # No restaurants/cafes/gyms detected
-                return {
+                yield "result", {
                     "status": "all_healthy",
                     "message": "No unhealthy restaurants, cafes, or gyms detected nearby.",
                     "nearby_food_places": [
                         {
-                            "name": p.get('name'),
-                            "types": p.get('types', [])[:2],
-                            "rating": p.get('rating', 'N/A')
+                            "name": p.name,
+                            "types": list(p.types[:2]),
+                            "rating": p.rating
                         } for p in nearby_places[:3]
                     ],
                     "total_places_found": len(nearby_places)
                 }
+                return
             
-            # 4. Get healthy alternatives (ONLY restaurants, cafes, gyms)
-            healthy_alternatives = []
-            if include_specific_locations:
-                healthy_alternatives = await self._get_healthy_alternatives(lat, lng, radius)
-            else:
-                # Even if include_specific_locations is false, try to get SOME alternatives
-                healthy_alternatives = await self._get_minimal_alternatives(lat, lng, radius)
-            
-            # 5. Generate AI message - ALWAYS try to include specific places
-            ai_message = await self._generate_ai_message(
-                target_place,
-                target_result,
-                healthy_alternatives,
-                user_context,
-                ai_service
-            )
-            
-            # 6. Build response
-            response = {
-                "status": "recommendation_generated",
+            detected = {
                 "detected_place": {
-                    "name": target_place.get('name'),
-                    "rating": target_place.get('rating', 'N/A'),
-                    "vicinity": target_place.get('vicinity', 'Address not available'),
-                    "types": target_place.get('types', []),
+                    "name": target_place.name,
+                    "rating": target_place.rating,
+                    "vicinity": target_place.vicinity,
+                    "types": list(target_place.types),
                     "category": target_result['category_name'],
                     "category_id": target_result['category_id'],
                     "is_unhealthy": target_result.get('is_unhealthy', False),
-                    "price_level": target_place.get('price_level_text', 'Unknown'),
-                    "place_id": target_place.get('place_id', '')
+                    "price_level": target_place.price_level_text,
+                    "place_id": target_place.place_id or ''
                 },
                 "recommendations": target_result['recommendations'],
+                "top_targets": [
+                    {
+                        "name": nearby_places[i].name,
+                        "place_id": nearby_places[i].place_id,
+                        "category_id": batch.category_ids[i],
+                        "is_unhealthy": batch.unhealthy[i],
+                        "rating": nearby_places[i].rating,
+                        "distance": nearby_places[i].distance,
+                        "distance_text": nearby_places[i].distance_text,
+                        "score": score
+                    } for i, score in ranked
+                ],
                 "total_places_found": len(nearby_places)
             }
+            yield "detected", detected
+            
+            # 4-5. Alternatives and AI message as concurrent stages - the message
+            # starts as soon as the alternatives it mentions are known
+            if include_specific_locations:
+                alternatives_coro = self._get_healthy_alternatives(lat, lng, radius, pool)
+            else:
+                # Even if include_specific_locations is false, try to get SOME alternatives
+                alternatives_coro = self._get_minimal_alternatives(lat, lng, radius, pool)
+            
+            # Plain tasks rather than a TaskGroup - a generator must not yield inside one.
+            # Both stages handle their own errors; finally cancels them if the consumer goes away.
+            alternatives_task = asyncio.create_task(self._run_stage(
+                "alternatives", settings.PIPELINE_ALTERNATIVES_TIMEOUT, alternatives_coro, timed_out, fallback=[]
+            ))
+            message_task = asyncio.create_task(self._message_stage(
+                alternatives_task, target_place, target_result, user_context, ai_service, pool, timed_out
+            ))
+            try:
+                healthy_alternatives = await alternatives_task
+                yield "alternatives", {"healthy_alternatives": healthy_alternatives}
+                
+                ai_message = await message_task
+                yield "ai_message", {"ai_message": ai_message}
+            finally:
+                alternatives_task.cancel()
+                message_task.cancel()
+            
+            # 6. Build response
+            response = {"status": "recommendation_generated", **detected}
             
             # Add healthy alternatives if we have them
             if healthy_alternatives:
@@ -140,50 +197,151 @@ class RecommendationService:
             # Add AI message
             response["ai_message"] = ai_message
             
-            logger.info(f"🎯 Recommendation generated for: {target_place.get('name')}")
-            return response
+            if timed_out:
+                response["partial"] = True
+                response["timed_out_stages"] = timed_out
+            
+            logger.info(f"🎯 Recommendation generated for: {target_place.name}")
+            yield "result", response
             
         except Exception as e:
             logger.error(f"❌ Error: {e}", exc_info=True)
-            return {
+            yield "result", {
                 "status": "error",
                 "message": "Unable to generate recommendations",
                 "error": str(e)
             }
     
+    async def recommend_batch(
+        self,
+        locations: List[Dict[str, Any]],
+        radius: int = 500,
+        user_context: str = "",
+        include_specific_locations: bool = False,
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Recommendations for many coordinates ({lat, lng, radius?, context?}).
+        
+        Every location runs the pipeline at its own radius on the cached per-type
+        tiles, with bounded concurrency. Locations are started in geohash order,
+        so neighbours share tile searches (coalesced while in flight, cached after).
+        Returns per-location results in input order.
+        """
+        semaphore = asyncio.Semaphore(max(settings.BATCH_CONCURRENCY, 1))
+        
+        async def recommend_one(i: int) -> Dict[str, Any]:
+            location = locations[i]
+            context = " ".join(filter(None, [user_context, location.get('context')]))
+            async with semaphore:
+                try:
+                    response = await self.analyze_and_recommend(
+                        lat=location['lat'],
+                        lng=location['lng'],
+                        radius=location.get('radius') or radius,
+                        user_context=context,
+                        include_specific_locations=include_specific_locations,
+                        top_k=top_k,
+                        shared_tiles=True
+                    )
+                except Exception as e:
+                    logger.error(f"❌ Batch item {i} failed: {e}")
+                    response = {"status": "error", "message": "Unable to generate recommendations", "error": str(e)}
+            return {"index": i, "lat": location['lat'], "lng": location['lng'], **response}
+        
+        order = sorted(
+            range(len(locations)),
+            key=lambda i: geo.geohash_encode(locations[i]['lat'], locations[i]['lng'], 9)
+        )
+        logger.info(f"📦 Batch of {len(locations)} locations")
+        tasks = {i: asyncio.create_task(recommend_one(i)) for i in order}
+        await asyncio.gather(*tasks.values())
+        return [tasks[i].result() for i in range(len(locations))]
+    
+    async def _run_stage(
+        self,
+        name: str,
+        timeout: float,
+        coro: Awaitable,
+        timed_out: List[str],
+        fallback: Any = None
+    ) -> Any:
+        """
+        Await one pipeline stage under its deadline, returning fallback if it overruns.
+        The deadline is shortened to what is left of the request's latency budget.
+        """
+        timeout = deadline.clamp(timeout)
+        if timeout <= 0:
+            coro.close()
+            logger.warning(f"⏱️ No latency budget left for stage '{name}' - skipped")
+            timed_out.append(name)
+            return fallback
+        
+        try:
+            async with asyncio.timeout(timeout):
+                return await coro
+        except TimeoutError:
+            logger.warning(f"⏱️ Stage '{name}' exceeded {timeout:.2f}s - continuing with a partial result")
+            timed_out.append(name)
+            return fallback
+    
+    async def _message_stage(
+        self,
+        alternatives_task: "asyncio.Task",
+        target_place: Place,
+        target_result: Dict,
+        user_context: str,
+        ai_service,
+        pool: PlacePool,
+        timed_out: List[str]
+    ) -> str:
+        """AI message stage - a template message if Gemini misses its deadline"""
+        healthy_alternatives = await alternatives_task
+        if deadline.exhausted(reserve=settings.LATENCY_BUDGET_MIN_AI):
+            logger.warning("⏱️ Latency budget too low for Gemini - using the template message")
+            timed_out.append("ai_message")
+            return self._template_message(target_place, healthy_alternatives)
+        
+        message = await self._run_stage(
+            "ai_message",
+            settings.PIPELINE_MESSAGE_TIMEOUT,
+            self._generate_ai_message(target_place, target_result, healthy_alternatives, user_context, ai_service, pool),
+            timed_out
+        )
+        return message or self._template_message(target_place, healthy_alternatives)
+    
     async def _get_healthy_alternatives(
         self,
         lat: float,
         lng: float,
-        radius: int
+        radius: int,
+        pool: PlacePool
     ) -> List[Dict[str, Any]]:
         """Get healthy alternatives - ONLY cafes, gyms, healthy restaurants"""
         try:
-            from app.services.google_service import google_service
+            from app.services.healthy_index import healthy_index
             
-            # Get healthy places from Google service
-            healthy_places = google_service.get_healthy_alternatives_nearby(lat, lng, radius)
+            # Nearest indexed healthy places, else a selection from the request's place pool
+            healthy_places = []
+            if healthy_index is not None:
+                healthy_places = healthy_index.nearest(lat, lng, k=5, max_radius=radius * 1.5)
+            if not healthy_places:
+                healthy_places = pool.healthy_alternatives()
             
             if not healthy_places:
-                return await self._get_minimal_alternatives(lat, lng, radius)
+                return await self._get_minimal_alternatives(lat, lng, radius, pool)
             
             # Format alternatives
             alternatives = []
-            for place in healthy_places[:5]:  # Top 5
-                # Calculate distance
-                distance = self._calculate_distance(
-                    lat, lng,
-                    place.get('geometry', {}).get('location', {}).get('lat'),
-                    place.get('geometry', {}).get('location', {}).get('lng')
-                )
-                
+            top_places = healthy_places[:5]  # Top 5
+            for place, distance in zip(top_places, geo.distances(lat, lng, top_places)):
                 # Skip if too far
                 if distance > radius * 1.5:  # Allow 50% extra
                     continue
                 
                 # Determine category
-                name = place.get('name', '').lower()
-                types = [t.lower() for t in place.get('types', [])]
+                name = place.name.lower()
+                types = place.types
                 
                 if 'gym' in name or 'fitness' in name or 'muscle' in name or 'gym' in types:
                     category = 'Gym'
@@ -197,14 +355,14 @@ class RecommendationService:
                     category = 'Healthy Place'
                 
                 alternative = {
-                    'name': place.get('name'),
+                    'name': place.name,
                     'category': category,
-                    'rating': place.get('rating', 'N/A'),
-                    'vicinity': place.get('vicinity', 'Address not available'),
+                    'rating': place.rating,
+                    'vicinity': place.vicinity,
                     'distance': distance,
                     'distance_text': f"{distance}m" if distance < 1000 else f"{distance/1000:.1f}km",
-                    'price_level': place.get('price_level_text', 'Unknown'),
-                    'types': place.get('types', [])[:2]
+                    'price_level': place.price_level_text,
+                    'types': list(place.types[:2])
                 }
                 alternatives.append(alternative)
             
@@ -221,37 +379,22 @@ class RecommendationService:
         self,
         lat: float,
         lng: float,
-        radius: int
+        radius: int,
+        pool: PlacePool
     ) -> List[Dict[str, Any]]:
         """Get at least some alternatives for AI message"""
         try:
-            from app.services.google_service import google_service
-            
-            # Search for any nearby places
-            places = google_service.get_nearby_places_by_types(
-                lat=lat,
-                lng=lng,
-                radius=radius,
-                place_types=['cafe', 'gym', 'food']
-            )
+            # Any nearby cafes, gyms or food places from the pool
+            places = pool.of_types(['cafe', 'gym', 'food'])
             
             if len(places) < 2:
                 return []
             
             alternatives = []
-            for i, place in enumerate(places[:3]):  # Get top 3
-                if i >= 2:  # Only need 2 for message
-                    break
-                    
-                # Calculate distance
-                distance = self._calculate_distance(
-                    lat, lng,
-                    place.get('geometry', {}).get('location', {}).get('lat'),
-                    place.get('geometry', {}).get('location', {}).get('lng')
-                )
-                
+            top_places = places[:2]  # Only need 2 for message
+            for place, distance in zip(top_places, geo.distances(lat, lng, top_places)):
                 # Determine category
-                name = place.get('name', '').lower()
+                name = place.name.lower()
                 if 'gym' in name or 'fitness' in name:
                     category = 'Gym'
                 elif 'cafe' in name or 'coffee' in name or 'tea' in name:
@@ -260,13 +403,13 @@ class RecommendationService:
                     category = 'Restaurant'
                 
                 alternative = {
-                    'name': place.get('name'),
+                    'name': place.name,
                     'category': category,
-                    'rating': place.get('rating', 'N/A'),
-                    'vicinity': place.get('vicinity', 'Address not available'),
+                    'rating': place.rating,
+                    'vicinity': place.vicinity,
                     'distance': distance,
                     'distance_text': f"{distance}m" if distance < 1000 else f"{distance/1000:.1f}km",
-                    'price_level': place.get('price_level_text', 'Unknown')
+                    'price_level': place.price_level_text
                 }
                 alternatives.append(alternative)
             
@@ -278,104 +421,76 @@ class RecommendationService:
     
     async def _generate_ai_message(
         self,
-        target_place: Dict,
+        target_place: Place,
         target_result: Dict,
         healthy_alternatives: List[Dict],
         user_context: str,
-        ai_service
+        ai_service,
+        pool: PlacePool
     ) -> str:
         """Generate AI message - ALWAYS try to include specific places"""
         try:
             # If we have healthy alternatives, use specific locations
             if healthy_alternatives and len(healthy_alternatives) >= 2:
                 return await ai_service.generate_recommendation_with_specific_locations(
-                    trigger_place_name=target_place.get('name'),
+                    trigger_place_name=target_place.name,
                     trigger_category=target_result['category_name'],
                     specific_alternatives=healthy_alternatives[:2],  # Use top 2
-                    user_context=user_context
+                    user_context=user_context,
+                    prompt_template=target_result.get('ai_prompt_template')
                 )
             else:
                 # Try to get at least 2 alternatives
-                lat = target_place.get('geometry', {}).get('location', {}).get('lat')
-                lng = target_place.get('geometry', {}).get('location', {}).get('lng')
+                lat, lng = target_place.location
                 
                 if lat and lng:
-                    from app.services.google_service import google_service
-                    # Get nearby places for this specific location
-                    nearby = google_service.get_nearby_places_by_types(
-                        lat=lat,
-                        lng=lng,
-                        radius=500,
-                        place_types=['cafe', 'gym', 'food']
-                    )
+                    # Pooled places around this specific location
+                    nearby = pool.near(lat, lng, 500, ['cafe', 'gym', 'food'])
                     
                     if nearby and len(nearby) >= 2:
                         # Format alternatives
                         formatted_alts = []
-                        for i, place in enumerate(nearby[:2]):
-                            if place.get('name') == target_place.get('name'):
+                        for place, distance in zip(nearby[:2], geo.distances(lat, lng, nearby[:2])):
+                            if place.name == target_place.name:
                                 continue  # Skip the target place
-                                
-                            distance = self._calculate_distance(
-                                lat, lng,
-                                place.get('geometry', {}).get('location', {}).get('lat'),
-                                place.get('geometry', {}).get('location', {}).get('lng')
-                            )
                             
                             alt = {
-                                'name': place.get('name'),
+                                'name': place.name,
                                 'distance': distance,
                                 'distance_text': f"{distance}m" if distance < 1000 else f"{distance/1000:.1f}km",
-                                'rating': place.get('rating', 'N/A')
+                                'rating': place.rating
                             }
                             formatted_alts.append(alt)
                         
                         if len(formatted_alts) >= 2:
                             return await ai_service.generate_recommendation_with_specific_locations(
-                                trigger_place_name=target_place.get('name'),
+                                trigger_place_name=target_place.name,
                                 trigger_category=target_result['category_name'],
                                 specific_alternatives=formatted_alts[:2],
-                                user_context=user_context
+                                user_context=user_context,
+                                prompt_template=target_result.get('ai_prompt_template')
                             )
             
             # Fallback to generic message
             return await ai_service.generate_recommendation_message(
-                trigger_place_name=target_place.get('name'),
+                trigger_place_name=target_place.name,
                 trigger_category=target_result['category_name'],
                 recommendations=target_result['recommendations'],
-                user_context=user_context
+                user_context=user_context,
+                prompt_template=target_result.get('ai_prompt_template')
             )
             
         except Exception as e:
             logger.error(f"AI message error: {e}")
-            # Simple fallback
-            place_name = target_place.get('name', 'this place')
-            if healthy_alternatives:
-                alt = healthy_alternatives[0]
-                return f"Instead of {place_name}, try {alt['name']} ({alt['distance_text']} away). It's a {alt.get('category', 'healthy place')} with {alt['rating']}★ rating!"
-            return f"Consider healthier restaurant, cafe, or gym options instead of {place_name}!"
+            return self._template_message(target_place, healthy_alternatives)
     
-    def _calculate_distance(
-        self,
-        lat1: float,
-        lng1: float,
-        lat2: Optional[float],
-        lng2: Optional[float]
-    ) -> int:
-        """Calculate distance in meters"""
-        if not lat2 or not lng2:
-            return 99999
-        
-        try:
-            lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
-            dlat = lat2 - lat1
-            dlng = lng2 - lng1
-            a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
-            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-            R = 6371000
-            return int(R * c)
-        except:
-            return 99999
+    def _template_message(self, target_place: Place, healthy_alternatives: List[Dict]) -> str:
+        """Simple fallback message without Gemini"""
+        place_name = target_place.name or 'this place'
+        if healthy_alternatives:
+            alt = healthy_alternatives[0]
+            return f"Instead of {place_name}, try {alt['name']} ({alt['distance_text']} away). It's a {alt.get('category', 'healthy place')} with {alt['rating']}★ rating!"
+        return f"Consider healthier restaurant, cafe, or gym options instead of {place_name}!"
 
 # Create singleton instance
 recommendation_service = RecommendationService()
\ No newline at end of file
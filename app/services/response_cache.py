@@ -0,0 +1,119 @@
+# app/services/response_cache.py
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import hashlib
+import logging
+import time
+
+from app.config import settings
+from app.services.places_cache import PlacesCache
+from app.utils import geo
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Only complete answers are reused - errors and partial (timed out) responses are not
+CACHEABLE_STATUSES = frozenset(["recommendation_generated", "all_healthy", "no_food_places"])
+
+
+@dataclass
+class _CachedResponse:
+    response: Dict[str, Any]
+    stored_at: float
+
+
+class RecommendationCache:
+    """
+    TTL + LRU cache of full recommendation responses.
+
+    Keyed on (geohash cell, radius bucket, context, user-profile hash,
+    rule-snapshot source and version, options), so requests a few metres apart share
+    one Places search and one Gemini call. A rules change moves every
+    request to new keys; the old entries age out.
+    """
+
+    def __init__(self):
+        self.precision = settings.RESPONSE_CACHE_PRECISION
+        self.ttl = settings.RESPONSE_CACHE_TTL
+        self.max_entries = settings.RESPONSE_CACHE_MAX_ENTRIES
+
+        self._entries: "OrderedDict[Hashable, _CachedResponse]" = OrderedDict()
+        self.in_flight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "uncacheable": 0}
+        logger.info("✅ RecommendationCache initialized")
+
+    def key(
+        self,
+        lat: float,
+        lng: float,
+        radius: int,
+        context: Optional[str],
+        user_context: str,
+        options: Tuple = ()
+    ) -> Tuple:
+        """Cache key for a request - user_context carries the profile preferences"""
+        from app.services.rule_engine import rule_engine
+
+        profile_hash = hashlib.sha1(user_context.encode("utf-8")).hexdigest()[:16]
+        return (
+            geo.geohash_encode(lat, lng, self.precision),
+            PlacesCache.radius_bucket(radius),
+            (context or "").strip().lower(),
+            profile_hash,
+            # Built-in and database rules can share a version number
+            (rule_engine.snapshot.source, rule_engine.snapshot.version),
+            options
+        )
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """(response, hit) - concurrent misses for one key share a single computation"""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at < self.ttl:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return dict(entry.response), True
+
+        self._stats["misses"] += 1
+        response = await self.in_flight.do(key, lambda: self._compute(key, compute))
+        # Callers add per-user fields to the top level - hand out copies
+        return dict(response), False
+
+    async def refresh(self, key: Hashable, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Recompute and store an entry ahead of requests (cache warming)"""
+        return await self.in_flight.do(key, lambda: self._compute(key, compute))
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Seconds since the entry was stored, None if absent or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry.stored_at
+        return age if age < self.ttl else None
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        response = await compute()
+
+        if response.get("status") in CACHEABLE_STATUSES and not response.get("partial"):
+            self._entries[key] = _CachedResponse(response=dict(response), stored_at=time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        else:
+            self._stats["uncacheable"] += 1
+
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "entries": len(self._entries)}
+
+    def clear(self):
+        self._entries.clear()
+
+# Singleton instance
+response_cache = RecommendationCache() if settings.RESPONSE_CACHE_ENABLED else None
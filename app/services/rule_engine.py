@@ -1,116 +1,314 @@
-
 # app/services/rule_engine.py
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
 import logging
+import threading
+
+from app.config import settings
+from app.services.rule_snapshot import RuleSnapshot, merge_builtins
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class BatchAnalysis:
+    """
+    Classification of a candidate list, as parallel arrays indexed like the input.
+    Full result dicts are only built on demand with result().
+    """
+    snapshot: RuleSnapshot
+    category_ids: Tuple[Optional[str], ...]
+    unhealthy: Tuple[bool, ...]
+    triggered_indices: Tuple[int, ...]
+    unhealthy_indices: Tuple[int, ...]
+
+    def result(self, index: int) -> Dict:
+        category_id = self.category_ids[index]
+        return self.snapshot.result(category_id) if category_id else {"triggered": False}
+
+
+class ClassificationMemo:
+    """
+    Bounded LRU of category ids keyed by (place_id, rule source, rule version).
+    Cleared whenever a new rule snapshot is swapped in. The source is part of the key
+    because the built-in and database snapshots can both be version 0.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, int], Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Tuple[str, str, int]) -> Any:
+        """Cached category id (None means 'not triggered'), or _MISSING"""
+        with self._lock:
+            category_id = self._entries.get(key, self._MISSING)
+            if category_id is self._MISSING:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+                self._entries.move_to_end(key)
+            return category_id
+
+    def put(self, key: Tuple[str, str, int], category_id: Optional[str]):
+        with self._lock:
+            self._entries[key] = category_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+
 class RuleEngine:
     def __init__(self):
         """Initialize Rule Engine"""
         # EXCLUDE these place types (NOT restaurants, cafes, gyms)
-        self.excluded_types = [
-            'locality', 'political', 'hospital', 'clinic', 'health', 
+        self.excluded_types = frozenset([
+            'locality', 'political', 'hospital', 'clinic', 'health',
             'shopping_mall', 'store', 'school', 'university', 'office',
             'company', 'bank', 'atm', 'parking', 'cemetery', 'church',
             'mosque', 'temple', 'government', 'post_office', 'library'
-        ]
-        
-        # ONLY detect these categories
+        ])
+
+        # Built-in rules - used until (or unless) the database rules load
         self.target_categories = {
             'fast_food': ['mcdonald', 'kfc', 'burger king', 'pizza', 'subway',
-                         'fast food', 'fried chicken', 'shwarma', 'burger', 
+                         'fast food', 'fried chicken', 'shwarma', 'burger',
                          'krunchy', 'karachy', 'bbq', 'fried'],
             'restaurant': ['restaurant', 'food', 'diner', 'eatery', 'bistro', 'hotel'],
-            'cafe': ['cafe', 'coffee', 'starbucks', 'coffee shop', 'espresso', 
+            'cafe': ['cafe', 'coffee', 'starbucks', 'coffee shop', 'espresso',
                     'tea shop', 'juice', 'sandwich'],
             'gym': ['gym', 'fitness', 'workout', 'exercise', 'yoga', 'muscle', 'club'],
             'bar_pub': ['bar', 'pub', 'nightclub', 'lounge', 'brewery', 'wine']
         }
-        
-        logger.info("✅ RuleEngine initialized")
-    
-    def detect_category_from_place(self, name: str, types: List[str] = None) -> Optional[str]:
-        """
-        ONLY detect restaurants, cafes, gyms - ignore everything else
-        """
-        if not name:
-            return None
-        
-        name_lower = name.lower()
-        
-        # 1. FIRST: Check if place has excluded types
-        if types:
-            for excluded_type in self.excluded_types:
-                if excluded_type in types:
-                    logger.debug(f"Ignoring '{name}' - has excluded type: {excluded_type}")
-                    return None
-        
-        # 2. Check for target categories
-        for category_id, keywords in self.target_categories.items():
-            for keyword in keywords:
-                if keyword in name_lower:
-                    logger.debug(f"Detected '{keyword}' in '{name}' -> {category_id}")
-                    return category_id
-        
-        # 3. Check place types (only food/gym related)
-        if types:
-            type_mapping = {
-                'restaurant': 'restaurant',
-                'food': 'restaurant',
-                'meal_takeaway': 'fast_food',
-                'cafe': 'cafe',
-                'gym': 'gym',
-                'bar': 'bar_pub',
-                'night_club': 'bar_pub'
-            }
-            
-            for place_type in types:
-                if place_type in type_mapping:
-                    return type_mapping[place_type]
-        
-        # Not a restaurant, cafe, or gym - ignore it
-        logger.debug(f"Ignoring '{name}' - not a restaurant, cafe, or gym")
-        return None
-    
-    def get_recommendations_for_category(self, category_id: str) -> List[str]:
-        """Get recommendations - ONLY restaurant, cafe, gym suggestions"""
+        self.unhealthy_categories = ['fast_food', 'bar_pub']
+
+        # Google place types that identify a category when no keyword matches
+        self.type_mapping = {
+            'restaurant': 'restaurant',
+            'food': 'restaurant',
+            'meal_takeaway': 'fast_food',
+            'cafe': 'cafe',
+            'gym': 'gym',
+            'bar': 'bar_pub',
+            'night_club': 'bar_pub'
+        }
+
         # Fallback recommendations if no rule found
-        recommendations_map = {
+        self.default_recommendations = {
             'fast_food': ['Healthy Cafe', 'Fresh Juice Bar', 'Salad Restaurant', 'Vegetarian Cafe'],
             'restaurant': ['Healthy Restaurant', 'Salad Bar', 'Fresh Juice Cafe', 'Vegetarian Place'],
             'cafe': ['Healthy Cafe', 'Fresh Juice Bar', 'Salad Restaurant'],
             'gym': ['Protein Cafe', 'Healthy Restaurant', 'Smoothie Bar'],
             'bar_pub': ['Coffee Shop', 'Healthy Cafe', 'Gym', 'Juice Bar']
         }
-        
-        return recommendations_map.get(category_id, ['Healthy Cafe', 'Fresh Juice', 'Salad Restaurant'])
-    
+
+        self.memo = ClassificationMemo(settings.RULES_MEMO_MAX_ENTRIES)
+        self.compile()
+        logger.info("✅ RuleEngine initialized")
+
+    def compile(self):
+        """Rebuild the snapshot from the built-in rules - call after changing them"""
+        self.snapshot = RuleSnapshot.build(
+            version=0,
+            source="defaults",
+            categories=self._builtin_categories(),
+            keywords=self._builtin_keywords(),
+            rules=[],
+            excluded_types=self.excluded_types,
+            default_type_mapping=self.type_mapping,
+            default_recommendations=self.default_recommendations
+        )
+        self.memo.clear()
+
+    def reload(self) -> bool:
+        """
+        Swap in the database snapshot if its rule version changed.
+
+        With RULES_SNAPSHOT_MMAP the first worker to see a version compiles it
+        into a shared file and every worker maps that file read-only.
+        Blocking - run it off the event loop. Keeps the current snapshot on any error.
+        """
+        try:
+            from app.services.neon_service import neon_db_service
+
+            version = neon_db_service.get_rules_version()
+            if self.snapshot.source == "database" and version == self.snapshot.version:
+                return False
+
+            inputs = self._database_inputs(neon_db_service.get_rule_tables())
+            if inputs is None:
+                return False
+
+            def build() -> RuleSnapshot:
+                return RuleSnapshot.build(version=version, source="database", **inputs)
+
+            if settings.RULES_SNAPSHOT_MMAP:
+                from app.services import rule_snapshot_file
+                snapshot = rule_snapshot_file.load_or_build(
+                    settings.RULES_SNAPSHOT_DIR, version, rule_snapshot_file.content_digest(inputs), build
+                )
+            else:
+                snapshot = build()
+        except Exception as e:
+            logger.error(f"Rule reload failed - keeping snapshot v{self.snapshot.version}: {e}")
+            return False
+
+        # Single attribute assignment - requests see the old or the new snapshot, never a mix
+        self.snapshot = snapshot
+        self.memo.clear()
+        logger.info(f"📚 Rule snapshot v{version} loaded: {snapshot.stats()}")
+        return True
+
+    def _database_inputs(self, tables: Dict[str, List[Dict]]) -> Optional[Dict[str, Any]]:
+        """RuleSnapshot.build arguments for the database rules, or None when there are none"""
+        if not tables["categories"]:
+            logger.warning("No categories in database - keeping built-in rules")
+            return None
+
+        # Admin-created categories get new ids - keep the built-in rules the database does not cover
+        categories, keywords, builtin_ids = merge_builtins(
+            tables["categories"], tables["keywords"], self._builtin_categories(), self._builtin_keywords()
+        )
+
+        return {
+            "categories": categories,
+            "keywords": keywords,
+            "rules": tables["rules"],
+            "excluded_types": self.excluded_types,
+            "default_type_mapping": self.type_mapping,
+            "default_recommendations": self.default_recommendations,
+            "builtin_ids": builtin_ids
+        }
+
+    def _builtin_categories(self) -> List[Dict]:
+        return [
+            {"id": c, "name": c.replace('_', ' ').title(), "is_unhealthy": c in self.unhealthy_categories}
+            for c in self.target_categories
+        ]
+
+    def _builtin_keywords(self) -> List[Dict]:
+        return [
+            {"keyword": k, "category_id": c, "match_type": "partial"}
+            for c, keywords in self.target_categories.items() for k in keywords
+        ]
+
+    def detect_category_from_place(self, name: str, types: List[str] = None) -> Optional[str]:
+        """
+        ONLY detect restaurants, cafes, gyms - ignore everything else
+        """
+        category_id = self.snapshot.classify(name, types)
+        logger.debug(f"'{name}' -> {category_id or 'ignored'}")
+        return category_id
+
+    def get_recommendations_for_category(self, category_id: str) -> List[str]:
+        """Get recommendations - ONLY restaurant, cafe, gym suggestions"""
+        snapshot = self.snapshot
+        if category_id in snapshot.recommendations:
+            return list(snapshot.recommendations[category_id])
+        return ['Healthy Cafe', 'Fresh Juice', 'Salad Restaurant']
+
     def analyze_place(self, name: str, types: List[str] = None) -> Dict:
         """Analyze place - ONLY for restaurants, cafes, gyms"""
         try:
-            category_id = self.detect_category_from_place(name, types)
-            
+            # One snapshot for the whole analysis, even if a reload swaps it meanwhile
+            snapshot = self.snapshot
+            category_id = snapshot.classify(name, types)
+            logger.debug(f"'{name}' -> {category_id or 'ignored'}")
+
             if category_id:
-                recommendations = self.get_recommendations_for_category(category_id)
-                
-                # Determine if unhealthy
-                is_unhealthy = category_id in ['fast_food', 'bar_pub']
-                category_name = category_id.replace('_', ' ').title()
-                
-                return {
-                    "triggered": True,
-                    "category_id": category_id,
-                    "category_name": category_name,
-                    "recommendations": recommendations,
-                    "is_unhealthy": is_unhealthy
-                }
-            
+                return snapshot.result(category_id)
+
             return {"triggered": False}
-            
+
         except Exception as e:
             logger.error(f"Error analyzing place: {e}")
             return {"triggered": False}
 
+    def classify_place(self, place, snapshot: Optional[RuleSnapshot] = None) -> Optional[str]:
+        """Category id for a Place, memoized by place_id for the snapshot's rule source and version"""
+        snapshot = snapshot or self.snapshot
+        if not place.place_id:
+            return snapshot.classify(place.name, place.types)
+
+        key = (place.place_id, snapshot.source, snapshot.version)
+        category_id = self.memo.get(key)
+        if category_id is ClassificationMemo._MISSING:
+            category_id = snapshot.classify(place.name, place.types)
+            self.memo.put(key, category_id)
+        return category_id
+
+    def analyze_places(self, places: Sequence) -> BatchAnalysis:
+        """
+        Classify a whole candidate list (Place objects) against one snapshot.
+        A failing place is left unclassified instead of failing the batch.
+        """
+        snapshot = self.snapshot
+        unhealthy_set = snapshot.unhealthy
+
+        category_ids = []
+        for place in places:
+            try:
+                category_ids.append(self.classify_place(place, snapshot))
+            except Exception as e:
+                logger.error(f"Error analyzing place: {e}")
+                category_ids.append(None)
+
+        unhealthy = tuple(c in unhealthy_set for c in category_ids)
+        analysis = BatchAnalysis(
+            snapshot=snapshot,
+            category_ids=tuple(category_ids),
+            unhealthy=unhealthy,
+            triggered_indices=tuple(i for i, c in enumerate(category_ids) if c),
+            unhealthy_indices=tuple(i for i, flag in enumerate(unhealthy) if flag)
+        )
+        logger.debug(f"Classified {len(places)} places: {len(analysis.triggered_indices)} triggered")
+        return analysis
+
+
+class RuleSnapshotPoller:
+    """Background task swapping in a rebuilt rule snapshot when admins change the rules"""
+
+    def __init__(self, engine: RuleEngine):
+        self.engine = engine
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("📚 Rule snapshot poller started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.to_thread(self.engine.reload)
+            await asyncio.sleep(settings.RULES_RELOAD_INTERVAL)
+
 # Create a global instance
-rule_engine = RuleEngine()
\ No newline at end of file
+rule_engine = RuleEngine()
+rule_snapshot_poller = RuleSnapshotPoller(rule_engine) if settings.RULES_FROM_DATABASE else None
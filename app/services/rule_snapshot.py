@@ -0,0 +1,199 @@
+# app/services/rule_snapshot.py
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+import logging
+import re
+
+from app.services.keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+GENERIC_RECOMMENDATIONS = ('Healthy Cafe', 'Fresh Juice', 'Salad Restaurant')
+
+
+def _normalize_name(name: str) -> str:
+    # "Bar/Pub" and "bar_pub" both become "bar pub"
+    return " ".join(re.split(r"[^a-z0-9]+", name.lower())).strip()
+
+
+def merge_builtins(
+    categories: List[Dict[str, Any]],
+    keywords: List[Dict[str, Any]],
+    builtin_categories: List[Dict[str, Any]],
+    builtin_keywords: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Database categories/keywords plus the built-in rules they do not cover.
+
+    A built-in category resolves to a database category with the same id
+    (seeded databases) or the same name. Unresolved built-ins are appended
+    after the database categories - so admin rules take priority - together
+    with their keywords. Returns (categories, keywords, builtin_ids).
+    """
+    by_id = {c['id'] for c in categories}
+    by_name = {_normalize_name(c.get('name') or ''): c['id'] for c in categories}
+
+    categories, keywords = list(categories), list(keywords)
+    builtin_ids, unresolved = {}, []
+    for builtin in builtin_categories:
+        builtin_id = builtin['id']
+        category_id = builtin_id if builtin_id in by_id else by_name.get(_normalize_name(builtin_id))
+        if category_id is None:
+            unresolved.append(builtin_id)
+            categories.append(builtin)
+            keywords.extend(kw for kw in builtin_keywords if kw['category_id'] == builtin_id)
+            category_id = builtin_id
+        builtin_ids[category_id] = builtin_id
+
+    if unresolved:
+        logger.warning(f"Built-in categories {unresolved} not found in the database - keeping their built-in rules")
+    return categories, keywords, builtin_ids
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    """
+    Immutable, compiled view of the category/keyword/rule tables.
+
+    A snapshot is built once (from the database or the built-in defaults)
+    and swapped in as a whole, so classification never touches the database
+    and never sees a half-updated rule set.
+    """
+    version: int
+    source: str
+    category_ids: Tuple[str, ...]  # priority order - earlier categories win
+    category_names: Mapping[str, str]
+    unhealthy: FrozenSet[str]
+    excluded_types: FrozenSet[str]
+    exact: Mapping[str, str]  # lower-cased full name -> category_id
+    type_mapping: Mapping[str, str]  # Google place type -> category_id
+    recommendations: Mapping[str, Tuple[str, ...]]
+    prompt_templates: Mapping[str, str]
+    builtin_ids: Mapping[str, str]  # category_id -> built-in category it stands for
+    matcher: KeywordMatcher = field(repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        source: str,
+        categories: List[Dict[str, Any]],
+        keywords: Iterable[Dict[str, Any]],
+        rules: Iterable[Dict[str, Any]],
+        excluded_types: Iterable[str],
+        default_type_mapping: Optional[Dict[str, str]] = None,
+        default_recommendations: Optional[Dict[str, List[str]]] = None,
+        builtin_ids: Optional[Dict[str, str]] = None
+    ) -> "RuleSnapshot":
+        """
+        Compile table rows.
+
+        categories:  [{id, name, is_unhealthy}] in priority order
+        keywords:    [{keyword, category_id, match_type}] - match_type exact, partial or type
+        rules:       [{trigger_category_id, ai_prompt_template, recommended_category_names}]
+        builtin_ids: {category_id: built-in id} (see merge_builtins) - defaults to matching ids
+        """
+        category_ids = tuple(c['id'] for c in categories)
+        priority = {category_id: i for i, category_id in enumerate(category_ids)}
+        if builtin_ids is None:
+            builtin_ids = {category_id: category_id for category_id in category_ids}
+        resolved = {builtin_id: category_id for category_id, builtin_id in builtin_ids.items()}
+
+        partial, exact = [], {}
+        # Built-in type mappings apply to whichever category stands for the built-in
+        type_mapping = {
+            place_type: resolved[builtin_id]
+            for place_type, builtin_id in (default_type_mapping or {}).items()
+            if builtin_id in resolved
+        }
+
+        for kw in keywords:
+            keyword = (kw.get('keyword') or '').strip().lower()
+            category_id = kw.get('category_id')
+            if not keyword or category_id not in priority:
+                continue
+
+            match_type = kw.get('match_type') or 'partial'
+            if match_type == 'exact':
+                # Keep the highest-priority category for duplicate names
+                if keyword not in exact or priority[category_id] < priority[exact[keyword]]:
+                    exact[keyword] = category_id
+            elif match_type == 'type':
+                type_mapping[keyword] = category_id
+            else:
+                partial.append((keyword, priority[category_id]))
+
+        defaults = default_recommendations or {}
+        recommendations = {
+            category_id: tuple(defaults.get(builtin_ids.get(category_id), GENERIC_RECOMMENDATIONS))
+            for category_id in category_ids
+        }
+        prompt_templates = {}
+        for rule in rules:
+            category_id = rule.get('trigger_category_id')
+            if category_id not in priority:
+                continue
+            if rule.get('recommended_category_names'):
+                recommendations[category_id] = tuple(rule['recommended_category_names'])
+            if rule.get('ai_prompt_template'):
+                prompt_templates[category_id] = rule['ai_prompt_template']
+
+        return cls(
+            version=version,
+            source=source,
+            category_ids=category_ids,
+            category_names={c['id']: c.get('name') or c['id'].replace('_', ' ').title() for c in categories},
+            unhealthy=frozenset(c['id'] for c in categories if c.get('is_unhealthy')),
+            excluded_types=frozenset(excluded_types),
+            exact=exact,
+            type_mapping=type_mapping,
+            recommendations=recommendations,
+            prompt_templates=prompt_templates,
+            builtin_ids=builtin_ids,
+            matcher=KeywordMatcher(partial)
+        )
+
+    def classify(self, name: str, types: Optional[Iterable[str]] = None) -> Optional[str]:
+        """Category id for a place - exact names, then keywords, then place types"""
+        if not name:
+            return None
+
+        if types and not self.excluded_types.isdisjoint(types):
+            return None
+
+        category_id = self.exact.get(name.strip().lower())
+        if category_id:
+            return category_id
+
+        match = self.matcher.match(name)
+        if match:
+            return self.category_ids[match[1]]
+
+        if types:
+            for place_type in types:
+                if place_type in self.type_mapping:
+                    return self.type_mapping[place_type]
+
+        return None
+
+    def result(self, category_id: str) -> Dict[str, Any]:
+        """analyze_place-style result for a detected category"""
+        return {
+            "triggered": True,
+            "category_id": category_id,
+            "category_name": self.category_names[category_id],
+            "recommendations": list(self.recommendations[category_id]),
+            "is_unhealthy": category_id in self.unhealthy,
+            "ai_prompt_template": self.prompt_templates.get(category_id),
+            "rule_version": self.version
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "categories": len(self.category_ids),
+            "keywords": len(self.matcher.keywords) + len(self.exact),
+            "type_mappings": len(self.type_mapping),
+            "rules": len(self.prompt_templates)
+        }
@@ -0,0 +1,174 @@
+# app/services/rule_snapshot_file.py
+from array import array
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+import glob
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+
+from app.services.keyword_matcher import MappedKeywordMatcher
+from app.services.rule_snapshot import RuleSnapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows - os.replace still keeps readers safe
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RSNP"
+FORMAT_VERSION = 2
+
+# magic, format version, rule version, metadata length, states, edges, keywords
+HEADER = struct.Struct("<4sIqIIII")
+
+ARRAY_ORDER = ("edge_start", "edge_char", "edge_target", "fail", "best", "priorities")
+
+
+def content_digest(inputs: Any) -> str:
+    """Short stable hash of everything a snapshot is built from"""
+    def encode(value):
+        if isinstance(value, (set, frozenset)):
+            return sorted(value)
+        return str(value)
+
+    payload = json.dumps(inputs, sort_keys=True, default=encode).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def snapshot_path(directory: str, version: int, digest: str) -> str:
+    # Content in the name - rows written without a version bump get a new file, not a stale one.
+    # Format in the name - files from an older release are rebuilt, not misread
+    return os.path.join(directory, f"rules-v{version}-{digest}.f{FORMAT_VERSION}.snap")
+
+
+@contextmanager
+def _build_lock(directory: str):
+    """Cross-process lock so only one worker builds a given snapshot file"""
+    with open(os.path.join(directory, ".build.lock"), "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_snapshot_file(snapshot: RuleSnapshot, path: str):
+    """Serialize a compiled snapshot - written to a temp file and atomically renamed into place"""
+    arrays = snapshot.matcher.to_arrays()
+    metadata = json.dumps({
+        "source": snapshot.source,
+        "byteorder": sys.byteorder,
+        "category_ids": list(snapshot.category_ids),
+        "category_names": dict(snapshot.category_names),
+        "unhealthy": sorted(snapshot.unhealthy),
+        "excluded_types": sorted(snapshot.excluded_types),
+        "exact": dict(snapshot.exact),
+        "type_mapping": dict(snapshot.type_mapping),
+        "recommendations": {k: list(v) for k, v in snapshot.recommendations.items()},
+        "prompt_templates": dict(snapshot.prompt_templates),
+        "builtin_ids": dict(snapshot.builtin_ids),
+        "keywords": list(snapshot.matcher.keywords)
+    }).encode("utf-8")
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, snapshot.version, len(metadata),
+        len(arrays["fail"]), len(arrays["edge_char"]), len(arrays["priorities"])
+    )
+    padding = b"\0" * (-(len(header) + len(metadata)) % 4)  # int arrays start 4-byte aligned
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header + metadata + padding)
+        for name in ARRAY_ORDER:
+            array("i", arrays[name]).tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot_file(path: str) -> RuleSnapshot:
+    """Map a snapshot file read-only; the automaton arrays are used in place, not copied"""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, format_version, version, metadata_len, states, edges, keywords = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError(f"Not a rule snapshot file (format {format_version}): {path}")
+
+    offset = HEADER.size
+    metadata = json.loads(mm[offset:offset + metadata_len].decode("utf-8"))
+    if metadata["byteorder"] != sys.byteorder:
+        raise ValueError(f"Rule snapshot {path} was written with {metadata['byteorder']}-endian ints")
+    offset += metadata_len
+    offset += -offset % 4
+
+    view = memoryview(mm)
+    lengths = {
+        "edge_start": states + 1, "edge_char": edges, "edge_target": edges,
+        "fail": states, "best": states, "priorities": keywords
+    }
+    arrays = {}
+    for name in ARRAY_ORDER:
+        size = lengths[name] * 4
+        arrays[name] = view[offset:offset + size].cast("i")
+        offset += size
+
+    return RuleSnapshot(
+        version=version,
+        source=metadata["source"],
+        category_ids=tuple(metadata["category_ids"]),
+        category_names=metadata["category_names"],
+        unhealthy=frozenset(metadata["unhealthy"]),
+        excluded_types=frozenset(metadata["excluded_types"]),
+        exact=metadata["exact"],
+        type_mapping=metadata["type_mapping"],
+        recommendations={k: tuple(v) for k, v in metadata["recommendations"].items()},
+        prompt_templates=metadata["prompt_templates"],
+        builtin_ids=metadata["builtin_ids"],
+        matcher=MappedKeywordMatcher(metadata["keywords"], arrays)
+    )
+
+
+def load_or_build(
+    directory: str,
+    version: int,
+    digest: str,
+    build: Callable[[], Optional[RuleSnapshot]]
+) -> Optional[RuleSnapshot]:
+    """
+    Map the snapshot file for a rule version and content digest, building it first if no worker has yet.
+    build() returns None when there is nothing to build (e.g. no rules in the database).
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(directory, version, digest)
+
+    if not os.path.exists(path):
+        with _build_lock(directory):
+            # Another worker may have built it while we waited for the lock
+            if not os.path.exists(path):
+                snapshot = build()
+                if snapshot is None:
+                    return None
+                write_snapshot_file(snapshot, path)
+                logger.info(f"📚 Wrote rule snapshot file {path}")
+                _remove_old_files(directory, keep=path)
+
+    return load_snapshot_file(path)
+
+
+def _remove_old_files(directory: str, keep: str):
+    # Workers still mapping an old file keep their pages until they swap
+    for path in glob.glob(os.path.join(directory, "rules-v*.snap")):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove old rule snapshot {path}: {e}")
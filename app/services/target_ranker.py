@@ -0,0 +1,106 @@
+# app/services/target_ranker.py
+from typing import Dict, List, Sequence, Tuple
+import heapq
+import logging
+import math
+
+from app.config import settings
+from app.models.place_model import Place
+from app.utils import geo
+
+logger = logging.getLogger(__name__)
+
+# Ratings count at which the popularity term saturates
+POPULARITY_SATURATION = 10000
+
+
+class TargetRanker:
+    """
+    Scores triggered places and picks the top-k recommendation targets.
+
+    score = w_distance * closeness + w_rating * rating / 5
+          + w_popularity * log-scaled user_ratings_total + w_severity * category severity
+
+    Each term is in [0, 1]; weights come from settings.
+    """
+
+    def __init__(self):
+        self.weights = {
+            "distance": settings.TARGET_WEIGHT_DISTANCE,
+            "rating": settings.TARGET_WEIGHT_RATING,
+            "popularity": settings.TARGET_WEIGHT_POPULARITY,
+            "severity": settings.TARGET_WEIGHT_SEVERITY
+        }
+        self.category_severity = self._parse_severity(settings.TARGET_CATEGORY_SEVERITY)
+        logger.info("✅ TargetRanker initialized")
+
+    @staticmethod
+    def _parse_severity(value: str) -> Dict[str, float]:
+        # TARGET_CATEGORY_SEVERITY looks like "fast_food:1.0,bar_pub:0.8"
+        severity = {}
+        for item in value.split(','):
+            category_id, _, weight = item.strip().rpartition(':')
+            if category_id:
+                severity[category_id] = float(weight)
+        return severity
+
+    def severity(self, category_id: str, is_unhealthy: bool) -> float:
+        """Configured severity, else 1 for unhealthy categories and 0 otherwise"""
+        from app.services.rule_engine import rule_engine
+
+        # Severity is configured by built-in id; database categories may carry other ids
+        builtin_id = rule_engine.snapshot.builtin_ids.get(category_id, category_id)
+        default = 1.0 if is_unhealthy else 0.0
+        return self.category_severity.get(category_id, self.category_severity.get(builtin_id, default))
+
+    def score(
+        self,
+        place: Place,
+        category_id: str,
+        is_unhealthy: bool,
+        lat: float,
+        lng: float,
+        radius: int
+    ) -> float:
+        """Relevance of one triggered place - sets place.distance as a side effect"""
+        if place.distance is None:
+            place.distance = geo.haversine_m(lat, lng, place.lat, place.lng)
+
+        closeness = 1 - min(place.distance / max(radius, 1), 1)
+        rating = min((place.rating or 0) / 5, 1)
+        popularity = min(math.log1p(place.user_ratings_total or 0) / math.log1p(POPULARITY_SATURATION), 1)
+
+        return (
+            self.weights["distance"] * closeness
+            + self.weights["rating"] * rating
+            + self.weights["popularity"] * popularity
+            + self.weights["severity"] * self.severity(category_id, is_unhealthy)
+        )
+
+    def top_k(
+        self,
+        places: Sequence[Place],
+        category_ids: Sequence[str],
+        unhealthy: Sequence[bool],
+        indices: Sequence[int],
+        lat: float,
+        lng: float,
+        radius: int,
+        k: int
+    ) -> List[Tuple[int, float]]:
+        """(index, score) of the k best places among indices, best first"""
+        # Distances for every candidate in one vectorized call
+        pending = [places[i] for i in indices if places[i].distance is None]
+        for place, distance in zip(pending, geo.distances(lat, lng, pending)):
+            place.distance = distance
+
+        scored = (
+            (self.score(places[i], category_ids[i], unhealthy[i], lat, lng, radius), places[i].place_id or '', i)
+            for i in indices
+        )
+        # Ties break on place_id so the choice does not depend on result order
+        best = heapq.nlargest(k, scored, key=lambda item: (item[0], item[1]))
+        return [(i, round(score, 4)) for score, _, i in best]
+
+# Singleton instance
+target_ranker = TargetRanker()
@@ -0,0 +1,157 @@
+# app/services/upstream_recorder.py
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMiss(Exception):
+    """Replay mode found no recorded response for a request"""
+
+
+class ReplayedError(Exception):
+    """An upstream error recorded in the corpus, raised again on replay"""
+
+    def __init__(self, message: str, status: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class UpstreamRecorder:
+    """
+    Record/replay transport for upstream API calls (Google Maps, Gemini).
+
+    UPSTREAM_MODE=live    - call upstream normally
+    UPSTREAM_MODE=record  - call upstream and append every request/response to the corpus
+    UPSTREAM_MODE=replay  - serve responses from the corpus with injected latency
+    """
+
+    def __init__(self, mode: str, corpus_path: str):
+        self.mode = mode.lower()
+        self.corpus_path = corpus_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._by_method: Dict[str, List[Dict[str, Any]]] = {}
+        self._write_lock = threading.Lock()
+        self._rng = random.Random(0)  # deterministic jitter across replay runs
+        self._stats = {"recorded": 0, "replayed": 0, "fallbacks": 0, "misses": 0}
+
+        if self.mode == "replay":
+            self._load_corpus()
+        if self.mode != "live":
+            logger.info(f"📼 Upstream {self.mode} mode - corpus: {self.corpus_path}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def request_key(service: str, method: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps([service, method, params], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    async def call(
+        self,
+        service: str,
+        method: str,
+        params: Dict[str, Any],
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run an upstream call through the configured mode"""
+        if self.mode == "replay":
+            return await self._replay(service, method, params)
+        if self.mode != "record":
+            return await fn()
+
+        started = time.monotonic()
+        try:
+            response = await fn()
+        except Exception as e:
+            self._record(service, method, params, started, error={
+                "message": str(e),
+                "status": getattr(e, 'status', None)
+            })
+            raise
+
+        self._record(service, method, params, started, response=response)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, **self._stats}
+
+    # ========== RECORD ==========
+
+    def _record(self, service, method, params, started, response=None, error=None):
+        entry = {
+            "key": self.request_key(service, method, params),
+            "service": service,
+            "method": method,
+            "params": params,
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
+            "response": response,
+            "error": error
+        }
+        line = json.dumps(entry, default=str)
+
+        with self._write_lock:
+            with open(self.corpus_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        self._stats["recorded"] += 1
+
+    # ========== REPLAY ==========
+
+    def _load_corpus(self):
+        if not os.path.exists(self.corpus_path):
+            logger.warning(f"Replay corpus not found: {self.corpus_path}")
+            return
+
+        with open(self.corpus_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]] = entry
+                    self._by_method.setdefault(f"{entry['service']}.{entry['method']}", []).append(entry)
+
+        logger.info(f"📼 Loaded {len(self._entries)} recorded upstream responses")
+
+    async def _replay(self, service: str, method: str, params: Dict[str, Any]) -> Any:
+        key = self.request_key(service, method, params)
+        entry = self._entries.get(key)
+
+        if entry is None and service in settings.UPSTREAM_REPLAY_FALLBACK_SERVICES:
+            # Prompts vary with result order - any recorded response of the same
+            # call stands in, picked deterministically from the request key
+            candidates = self._by_method.get(f"{service}.{method}")
+            if candidates:
+                entry = candidates[int(key, 16) % len(candidates)]
+                self._stats["fallbacks"] += 1
+
+        if entry is None:
+            self._stats["misses"] += 1
+            raise ReplayMiss(f"No recorded {service}.{method} response for {params}")
+
+        await asyncio.sleep(self._latency(entry) / 1000)
+        self._stats["replayed"] += 1
+
+        if entry.get("error"):
+            raise ReplayedError(entry["error"]["message"], entry["error"].get("status"))
+        return entry["response"]
+
+    def _latency(self, entry: Dict[str, Any]) -> float:
+        """Injected latency in ms - fixed if configured, else the recorded one"""
+        if settings.UPSTREAM_REPLAY_LATENCY_MS >= 0:
+            latency = settings.UPSTREAM_REPLAY_LATENCY_MS
+        else:
+            latency = entry.get("latency_ms", 0) * settings.UPSTREAM_REPLAY_LATENCY_SCALE
+        return max(latency + self._rng.uniform(-1, 1) * settings.UPSTREAM_REPLAY_JITTER_MS, 0)
+
+# Singleton instance
+upstream_recorder = UpstreamRecorder(settings.UPSTREAM_MODE, settings.UPSTREAM_CORPUS_PATH)
@@ -0,0 +1,77 @@
+# app/utils/deadline.py
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Dict, Optional
+import time
+
+from app.config import settings
+
+# Absolute time.monotonic() deadline of the current request, None when unbounded.
+# Context variables are copied into tasks and to_thread calls, so every stage sees it.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class BudgetExceeded(TimeoutError):
+    """Raised by a stage that would start with too little of the request budget left"""
+
+
+def _parse_endpoint_budgets(value: str) -> Dict[str, float]:
+    # LATENCY_BUDGET_ENDPOINTS looks like "recommend:25,recommend_stream:45"
+    budgets = {}
+    for item in value.split(','):
+        endpoint, _, seconds = item.strip().rpartition(':')
+        if endpoint:
+            budgets[endpoint] = float(seconds)
+    return budgets
+
+
+ENDPOINT_BUDGETS = _parse_endpoint_budgets(settings.LATENCY_BUDGET_ENDPOINTS)
+
+
+def budget_for(endpoint: str, requested_ms: Optional[int] = None) -> float:
+    """Budget in seconds - the request's budget_ms if given, else the endpoint's, capped at LATENCY_BUDGET_MAX"""
+    if requested_ms:
+        return min(requested_ms / 1000, settings.LATENCY_BUDGET_MAX)
+    return ENDPOINT_BUDGETS.get(endpoint, settings.LATENCY_BUDGET_DEFAULT)
+
+
+@contextmanager
+def latency_budget(seconds: Optional[float]):
+    """Bound everything inside to seconds from now - a nested budget never extends an outer one"""
+    deadline = time.monotonic() + seconds if seconds else None
+    outer = _deadline.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def detached() -> Context:
+    """Copy of the current context without a budget - for shared work that outlives the request"""
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget (never negative), None when unbounded"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def clamp(timeout: float) -> float:
+    """A stage timeout shortened to what is left of the budget"""
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+
+def exhausted(reserve: float = 0.0) -> bool:
+    """Whether less than reserve seconds are left"""
+    left = remaining()
+    return left is not None and left <= reserve
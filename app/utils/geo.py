@@ -0,0 +1,159 @@
+# app/utils/geo.py
+from typing import Iterable, List, Optional, Sequence, Tuple
+import math
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+UNKNOWN_DISTANCE = 99999
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_BASE32_INDEX = {c: i for i, c in enumerate(_BASE32)}
+
+
+def haversine_m(lat1: float, lng1: float, lat2: Optional[float], lng2: Optional[float]) -> int:
+    """Distance between two coordinates in meters (99999 if unknown)"""
+    if lat2 is None or lng2 is None:
+        return UNKNOWN_DISTANCE
+
+    lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return int(EARTH_RADIUS_M * c)
+
+
+# ========== VECTORIZED (one origin, many points) ==========
+
+def coordinates(places: Iterable) -> Tuple[np.ndarray, np.ndarray]:
+    """lat and lng arrays of Place-like objects - NaN where a coordinate is missing"""
+    locations = [place.location for place in places]
+    if not locations:
+        return np.empty(0), np.empty(0)
+    coords = np.array(locations, dtype=float).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1]
+
+
+def haversine_many(lat: float, lng: float, lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+    """Distances in meters (int) from one origin to many points - UNKNOWN_DISTANCE where missing"""
+    lats = np.radians(np.asarray(lats, dtype=float))
+    lngs = np.radians(np.asarray(lngs, dtype=float))
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+
+    a = np.sin((lats - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lats) * np.sin((lngs - lng1) / 2) ** 2
+    meters = 2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return np.where(np.isnan(meters), UNKNOWN_DISTANCE, meters).astype(np.int64)
+
+
+def distances(lat: float, lng: float, places: Iterable) -> List[int]:
+    """haversine_m for each place, in one vectorized call"""
+    lats, lngs = coordinates(places)
+    return haversine_many(lat, lng, lats, lngs).tolist()
+
+
+def bearing_many(lat: float, lng: float, lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+    """Initial compass bearing in degrees [0, 360) from one origin to many points"""
+    lats = np.radians(np.asarray(lats, dtype=float))
+    dlng = np.radians(np.asarray(lngs, dtype=float) - lng)
+    lat1 = math.radians(lat)
+
+    x = np.sin(dlng) * np.cos(lats)
+    y = math.cos(lat1) * np.sin(lats) - math.sin(lat1) * np.cos(lats) * np.cos(dlng)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+
+def bounding_box(lat: float, lng: float, radius: float) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lng_min, lng_max) enclosing a circle of radius meters"""
+    dlat = math.degrees(radius / EARTH_RADIUS_M)
+    dlng = dlat / max(math.cos(math.radians(lat)), 0.01)
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+# ========== GEOHASH ==========
+
+def geohash_encode(lat: float, lng: float, precision: int = 7) -> str:
+    """Encode a coordinate as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bit, ch, even = 0, 0, True
+
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch |= 1 << (4 - bit)
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+
+        if bit < 4:
+            bit += 1
+        else:
+            chars.append(_BASE32[ch])
+            bit, ch = 0, 0
+
+    return ''.join(chars)
+
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Return (lat_min, lat_max, lng_min, lng_max) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for c in geohash:
+        bits = _BASE32_INDEX[c]
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if bits >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    """Center (lat, lng) of a geohash cell"""
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(geohash)
+    return (lat_min + lat_max) / 2, (lng_min + lng_max) / 2
+
+
+def geohash_cell_degrees(precision: int) -> Tuple[float, float]:
+    """Cell height and width in degrees for a precision"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def geohash_cell_meters(precision: int, lat: float) -> Tuple[float, float]:
+    """Approximate cell height and width in meters at a latitude"""
+    lat_deg, lng_deg = geohash_cell_degrees(precision)
+    meters_per_deg = math.pi * EARTH_RADIUS_M / 180
+    return lat_deg * meters_per_deg, lng_deg * meters_per_deg * max(math.cos(math.radians(lat)), 0.01)
+
+
+def geohash_cover(lat: float, lng: float, radius: float, precision: int) -> List[str]:
+    """Geohash cells overlapping the bounding box of a circle, nearest first"""
+    lat_deg, lng_deg = geohash_cell_degrees(precision)
+    lat_min, lat_max, lng_min, lng_max = bounding_box(lat, lng, radius)
+
+    lat_start = math.floor((lat_min + 90) / lat_deg)
+    lat_end = math.floor((lat_max + 90) / lat_deg)
+    lng_start = math.floor((lng_min + 180) / lng_deg)
+    lng_end = math.floor((lng_max + 180) / lng_deg)
+
+    cells = {}
+    for i in range(lat_start, lat_end + 1):
+        cell_lat = min(max(-90 + (i + 0.5) * lat_deg, -90.0), 90.0)
+        for j in range(lng_start, lng_end + 1):
+            cell_lng = (-180 + (j + 0.5) * lng_deg + 180) % 360 - 180
+            cell = geohash_encode(cell_lat, cell_lng, precision)
+            cells[cell] = haversine_m(lat, lng, cell_lat, cell_lng)
+
+    return sorted(cells, key=cells.get)
@@ -0,0 +1,33 @@
+# app/utils/singleflight.py
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight call.
+
+    The first caller starts the call; callers arriving while it runs await the
+    same result instead of issuing their own. A waiter being cancelled does not
+    cancel the shared call.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+
+        if task is None:
+            self._stats["calls"] += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self._stats["coalesced"] += 1
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "in_flight": len(self._in_flight)}
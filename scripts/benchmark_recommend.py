@@ -0,0 +1,110 @@
+"""
+Offline throughput/latency benchmark for the recommend pipeline.
+
+Record a corpus against the real APIs once:
+    python scripts/benchmark_recommend.py --mode record --requests 20
+
+Then replay it on any box without API keys or quota:
+    python scripts/benchmark_recommend.py --mode replay --requests 500 --concurrency 50 --latency-ms 120
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+# Default sample points (Karachi food streets)
+DEFAULT_POINTS = [
+    (24.8607, 67.0011),
+    (24.8138, 67.0300),
+    (24.9263, 67.0338),
+    (24.8935, 67.0719),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark analyze_and_recommend with recorded upstream traffic")
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--corpus", default="upstream_corpus.jsonl", help="JSONL corpus of upstream calls")
+    parser.add_argument("--requests", type=int, default=100, help="Total recommendations to run")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--radius", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=-1, help="Injected replay latency (-1 = recorded)")
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the places cache and place store")
+    parser.add_argument("--points", default="", help="Coordinates as 'lat,lng;lat,lng'")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Settings are read at import time - set them before importing the app"""
+    os.environ["UPSTREAM_MODE"] = args.mode
+    os.environ["UPSTREAM_CORPUS_PATH"] = args.corpus
+    os.environ["UPSTREAM_REPLAY_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["UPSTREAM_REPLAY_JITTER_MS"] = str(args.jitter_ms)
+    if args.no_cache:
+        os.environ["PLACES_CACHE_ENABLED"] = "false"
+        os.environ["PLACE_STORE_BACKEND"] = "none"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_benchmark(args, points):
+    from app.services.recommend_service import recommendation_service
+    from app.services.upstream_recorder import upstream_recorder
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    statuses = Counter()
+
+    async def one(i):
+        lat, lng = points[i % len(points)]
+        async with semaphore:
+            started = time.perf_counter()
+            result = await recommendation_service.analyze_and_recommend(
+                lat=lat,
+                lng=lng,
+                radius=args.radius,
+                include_specific_locations=True
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[result.get("status")] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(args.requests)])
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "=" * 60)
+    print(f"📊 RECOMMEND BENCHMARK ({args.mode})")
+    print("=" * 60)
+    print(f"   Requests:     {args.requests} (concurrency {args.concurrency})")
+    print(f"   Throughput:   {args.requests / elapsed:.1f} req/s")
+    print(f"   Latency p50:  {statistics.median(latencies):.1f} ms")
+    print(f"   Latency p95:  {percentile(latencies, 95):.1f} ms")
+    print(f"   Latency p99:  {percentile(latencies, 99):.1f} ms")
+    print(f"   Statuses:     {dict(statuses)}")
+    print(f"   Upstream:     {upstream_recorder.stats()}")
+    print("=" * 60)
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    points = DEFAULT_POINTS
+    if args.points:
+        points = [tuple(map(float, p.split(","))) for p in args.points.split(";")]
+
+    asyncio.run(run_benchmark(args, points))
+
+
+if __name__ == "__main__":
+    main()
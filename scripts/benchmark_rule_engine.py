@@ -0,0 +1,205 @@
+"""
+Classification throughput benchmark for RuleEngine.
+
+Generates a seeded corpus of place names (English, Roman-Urdu and Urdu-script
+mixes) and times detect_category_from_place / analyze_place on each engine:
+
+    naive      - the original nested keyword loop (reference)
+    automaton  - in-process compiled snapshot (Aho-Corasick)
+    mmap       - the same snapshot written to a file and memory-mapped
+
+    python scripts/benchmark_rule_engine.py --names 100000
+    python scripts/benchmark_rule_engine.py --extra-keywords 5000   # simulate a large admin keyword list
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gc
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+
+# Building blocks for synthetic names
+ROMAN_URDU = [
+    "Karachi", "Lahori", "Nihari", "Biryani", "Chaye", "Chai", "Dhaba", "Khana", "Tikka", "Haleem",
+    "Paratha", "Sajji", "Shinwari", "Bun Kabab", "Chapli", "Seekh", "Karahi", "Pakwan", "Mithai",
+    "Lassi", "Doodh Patti", "Halwa Puri", "Gol Gappay", "Qeema", "Bhaiya", "Wala", "Ustad"
+]
+URDU_SCRIPT = ["کھانا", "چائے", "بریانی", "ہوٹل", "دھابہ", "نہاری", "کباب", "تکہ", "حلیم"]
+BRANDS = [
+    "KFC", "McDonald's", "Krunchy", "Karachy Broast", "Shwarma", "Subway", "Pizza Hut", "Burger Lab",
+    "Starbucks", "Gloria Jean's", "Espresso", "Gold's Gym", "Shapes Fitness", "Yoga Studio", "Juice Lab"
+]
+ENGLISH = [
+    "Corner", "Point", "House", "Express", "Grill", "Kitchen", "Bakers", "Sweets", "Family", "Royal",
+    "Fresh", "Hot", "Spicy", "Cafe", "Restaurant", "Hotel", "Club", "Lounge", "Tea Shop", "BBQ", "Fried"
+]
+SUFFIXES = ["", "", "& Sons", "Wala", "Center", "Outlet", "(DHA)", "- Clifton", "2", "Pvt Ltd"]
+PLACE_TYPES = ["restaurant", "food", "meal_takeaway", "cafe", "gym", "bar", "store", "lodging", "bakery"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark RuleEngine classification")
+    parser.add_argument("--names", type=int, default=100000, help="Corpus size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--extra-keywords", type=int, default=0, help="Synthetic keywords added per engine")
+    parser.add_argument("--engines", default="naive,automaton,mmap")
+    return parser.parse_args()
+
+
+def generate_corpus(size, seed):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            pool = rng.choices([ROMAN_URDU, URDU_SCRIPT, BRANDS, ENGLISH], weights=[4, 1, 2, 3])[0]
+            parts.append(rng.choice(pool))
+        name = " ".join(parts + [rng.choice(SUFFIXES)]).strip()
+        types = rng.sample(PLACE_TYPES, rng.randint(1, 3)) + ["point_of_interest", "establishment"]
+        corpus.append((name, types))
+    return corpus
+
+
+def synthetic_keywords(count, seed):
+    rng = random.Random(seed)
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10))) for _ in range(count)]
+
+
+class NaiveRuleEngine:
+    """The original nested-loop classifier, kept as the reference"""
+
+    def __init__(self, excluded_types, target_categories, type_mapping, unhealthy, recommendations):
+        self.excluded_types = list(excluded_types)
+        self.target_categories = target_categories
+        self.type_mapping = type_mapping
+        self.unhealthy = unhealthy
+        self.recommendations = recommendations
+
+    def detect_category_from_place(self, name, types=None):
+        if not name:
+            return None
+        name_lower = name.lower()
+        if types:
+            for excluded_type in self.excluded_types:
+                if excluded_type in types:
+                    return None
+        for category_id, keywords in self.target_categories.items():
+            for keyword in keywords:
+                if keyword in name_lower:
+                    return category_id
+        if types:
+            for place_type in types:
+                if place_type in self.type_mapping:
+                    return self.type_mapping[place_type]
+        return None
+
+    def analyze_place(self, name, types=None):
+        try:
+            category_id = self.detect_category_from_place(name, types)
+            if category_id:
+                return {
+                    "triggered": True,
+                    "category_id": category_id,
+                    "category_name": category_id.replace('_', ' ').title(),
+                    "recommendations": list(self.recommendations.get(category_id, [])),
+                    "is_unhealthy": category_id in self.unhealthy
+                }
+            return {"triggered": False}
+        except Exception:
+            return {"triggered": False}
+
+
+def build_engine(kind, extra_keywords, snapshot_dir):
+    """Construct one engine, returning it and the Python heap it retains"""
+    from app.services.rule_engine import RuleEngine
+    from app.services import rule_snapshot_file
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    engine = RuleEngine()
+    if extra_keywords:
+        per_category = len(extra_keywords) // len(engine.target_categories) + 1
+        for i, category_id in enumerate(engine.target_categories):
+            engine.target_categories[category_id] += extra_keywords[i * per_category:(i + 1) * per_category]
+        engine.compile()
+
+    if kind == "naive":
+        engine = NaiveRuleEngine(
+            engine.excluded_types, engine.target_categories, engine.type_mapping,
+            set(engine.unhealthy_categories), engine.default_recommendations
+        )
+    elif kind == "mmap":
+        path = rule_snapshot_file.snapshot_path(snapshot_dir, 0, "benchmark")
+        rule_snapshot_file.write_snapshot_file(engine.snapshot, path)
+        engine.snapshot = rule_snapshot_file.load_snapshot_file(path)
+        engine.target_categories = {}  # drop the source dicts - only the mapped snapshot remains
+
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return engine, retained
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def run_engine(engine, corpus):
+    detect = engine.detect_category_from_place
+    analyze = engine.analyze_place
+
+    # Throughput - one tight loop over the corpus
+    started = time.perf_counter()
+    categories = [detect(name, types) for name, types in corpus]
+    elapsed = time.perf_counter() - started
+
+    # Per-call latency of the full analyze_place path
+    latencies = []
+    clock = time.perf_counter_ns
+    for name, types in corpus:
+        t0 = clock()
+        analyze(name, types)
+        latencies.append(clock() - t0)
+
+    return categories, len(corpus) / elapsed, latencies
+
+
+def main():
+    args = parse_args()
+    corpus = generate_corpus(args.names, args.seed)
+    extra = synthetic_keywords(args.extra_keywords, args.seed) if args.extra_keywords else []
+
+    print("\n" + "=" * 72)
+    print(f"📊 RULE ENGINE BENCHMARK - {len(corpus)} names, {len(extra)} extra keywords")
+    print("=" * 72)
+    print(f"   {'engine':<10} {'names/sec':>12} {'p50 µs':>9} {'p99 µs':>9} {'heap KiB':>10} {'agrees':>8}")
+
+    reference = None
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        for kind in args.engines.split(","):
+            engine, retained = build_engine(kind.strip(), extra, snapshot_dir)
+            categories, throughput, latencies = run_engine(engine, corpus)
+
+            if reference is None:
+                reference = categories
+            agrees = sum(a == b for a, b in zip(categories, reference)) / len(corpus)
+
+            print(
+                f"   {kind:<10} {throughput:>12,.0f} {percentile(latencies, 50) / 1000:>9.2f} "
+                f"{percentile(latencies, 99) / 1000:>9.2f} {retained / 1024:>10.1f} {agrees:>7.1%}"
+            )
+            del engine
+
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from datetime import datetime
 import uuid
 
 from app.db.database__adapter import get_engine, Category, Keyword, Rule, Menu # type: ignore
+from app.db.neon_connection import RuleVersion
 from sqlalchemy.orm import sessionmaker
 
 load_dotenv()
@@ -164,6 +165,18 @@ def migrate_mongodb_to_postgresql():
         pg_session.commit()
         print(f"✅ Migrated {len(mongo_menus)} menus")
         
+        # 5. Bump the rule version so running workers rebuild their rule snapshots
+        print("\n📚 Bumping rule version...")
+        RuleVersion.__table__.create(bind=engine, checkfirst=True)
+        updated = pg_session.query(RuleVersion).filter(RuleVersion.id == 1).update({
+            RuleVersion.version: RuleVersion.version + 1,
+            RuleVersion.updated_at: datetime.utcnow()
+        })
+        if not updated:
+            pg_session.add(RuleVersion(id=1, version=1))
+        pg_session.commit()
+        print(f"✅ Rule version is now {pg_session.get(RuleVersion, 1).version}")
+        
         print("\n" + "=" * 50)
         print("🎉 Migration completed successfully!")
         print("\n📊 PostgreSQL Database Summary:")